@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import ast
+import functools
+import gc
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+
+
+@functools.lru_cache(maxsize=None)
+def _class_ranges(filename: str) -> tuple:
+    # (first line, last line, qualified class name) for every class in a source file
+    try:
+        with open(filename, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename)
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return ()
+    ranges = []
+
+    def visit(node, prefix: str):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                name = prefix + child.name
+                ranges.append((child.lineno, child.end_lineno, name))
+                visit(child, name + '.')
+            else:
+                visit(child, prefix)
+
+    visit(tree, '')
+    return tuple(ranges)
+
+
+def class_for_line(filename: str, lineno: int):
+    # innermost class whose body contains lineno, None for module level code
+    found = None
+    for first, last, name in _class_ranges(filename):
+        if first <= lineno <= last and (found is None or first >= found[0]):
+            found = (first, name)
+    return None if found is None else found[1]
+
+
+class AllocationProfiler:
+    # opt-in tick listener. Every tick: net allocated blocks (sys.getallocatedblocks),
+    # the transient peak of traced bytes, GC collections and GC pause time.
+    # capture() also breaks down everything allocated during each of the next capture_ticks
+    # ticks by source line and by spritelib class, short-lived temporaries included: a
+    # profile hook keeps the return values and locals of returning functions alive until
+    # the tick ends, so tracemalloc snapshots at both ends of the tick still see them.
+    # Only the Tk thread is hooked; with the simulation thread on, capture its ticks with
+    # FrameProfiler instead.
+
+    def __init__(self, frame, capture_ticks: int = 120, top: int = 15, traceback_depth: int = 8,
+                 stats_interval: int = 250, class_module: str = 'spritelib.py', output=None) -> None:
+        super().__init__()
+        self.frame = frame
+        self.capture_ticks = capture_ticks
+        self.top = top
+        self.traceback_depth = traceback_depth
+        self.stats_interval = stats_interval
+        self.class_module = class_module
+        self.output = output if output is not None else sys.stderr
+        self.last_report = None
+        self.running = False
+        self._owns_tracing = False
+        self._ticks = 0
+        self._blocks = 0
+        self._window_blocks = 0
+        self._window_peak = 0
+        self._window_peak_max = 0
+        self._collections = [0, 0, 0]
+        self._gc_pause = 0.0
+        self._gc_pause_max = 0.0
+        self._gc_started = None
+        self._capture_left = 0
+        self._capture_start = None
+        self._capture_stats = None
+        self._capture_lines = None
+        self._capture_classes = None
+        self._kept = []
+        self._previous_profile = None
+
+    def start(self):
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_depth)
+            self._owns_tracing = True
+        gc.callbacks.append(self._gc_callback)
+        self.frame.tick_listeners.append(self)
+        self._blocks = sys.getallocatedblocks()
+        tracemalloc.reset_peak()
+        self.running = True
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        gc.callbacks.remove(self._gc_callback)
+        self.frame.tick_listeners.remove(self)
+        if self._capture_left:
+            sys.setprofile(self._previous_profile)
+            self._kept.clear()
+        self._capture_left = 0
+        self._capture_start = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _gc_callback(self, phase: str, info: dict):
+        if phase == 'start':
+            self._gc_started = perf_counter()
+        elif self._gc_started is not None:
+            pause = (perf_counter() - self._gc_started) * 1000
+            self._gc_started = None
+            self._collections[info['generation']] += 1
+            self._gc_pause += pause
+            self._gc_pause_max = max(self._gc_pause_max, pause)
+
+    def capture(self, evt=None):
+        # hotkey handler; the report is printed once capture_ticks ticks have run
+        if not self.running:
+            self.start()
+        if self._capture_left:
+            return
+        self._capture_stats = (sys.getallocatedblocks(), list(self._collections), self._gc_pause)
+        self._capture_lines = {}
+        self._capture_classes = {}
+        self._capture_left = self.capture_ticks
+        self._begin_tick()
+
+    def __call__(self, frame):
+        blocks = sys.getallocatedblocks()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._window_blocks += blocks - self._blocks
+        self._blocks = blocks
+        self._window_peak += peak - current
+        self._window_peak_max = max(self._window_peak_max, peak - current)
+        self._ticks += 1
+        if self._ticks % self.stats_interval == 0:
+            self._emit_stats()
+        if self._capture_left:
+            self._end_tick()
+            self._capture_left -= 1
+            if self._capture_left:
+                self._begin_tick()
+            else:
+                self._finish_capture()
+
+    def _emit_stats(self):
+        telemetry = getattr(self.frame, 'telemetry', None)
+        if telemetry is not None:
+            ticks = self.stats_interval
+            telemetry.emit('alloc_stats', round(self._window_blocks / ticks, 2),
+                           round(self._window_peak / ticks), self._window_peak_max,
+                           list(self._collections), round(self._gc_pause, 2), round(self._gc_pause_max, 2))
+        self._window_blocks = 0
+        self._window_peak = 0
+        self._window_peak_max = 0
+        self._gc_pause_max = 0.0
+
+    def _keep(self, frame, event: str, arg):
+        # profile hook: what a returning function made stays alive until the tick's snapshot
+        if event == 'return':
+            self._kept.append(arg)
+            self._kept.extend(frame.f_locals.values())
+
+    def _begin_tick(self):
+        self._capture_start = tracemalloc.take_snapshot()
+        self._previous_profile = sys.getprofile()
+        sys.setprofile(self._keep)
+
+    def _end_tick(self):
+        # blocks in the end snapshot that were not in the start snapshot were allocated this tick;
+        # blocks freed during the tick (older ones) show up as negative and are skipped
+        sys.setprofile(self._previous_profile)
+        snapshot = tracemalloc.take_snapshot()
+        self._kept.clear()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diffs = snapshot.filter_traces(filters).compare_to(self._capture_start.filter_traces(filters), 'traceback')
+        self._capture_start = None
+        by_line, by_class = self._capture_lines, self._capture_classes
+        for diff in diffs:
+            if diff.count_diff <= 0 and diff.size_diff <= 0:
+                continue
+            top_frame = diff.traceback[-1]  # most recent frame is last
+            line = f'{os.path.basename(top_frame.filename)}:{top_frame.lineno}'
+            count, size = by_line.get(line, (0, 0))
+            by_line[line] = (count + diff.count_diff, size + diff.size_diff)
+            owner = self._owner(diff.traceback)
+            count, size = by_class.get(owner, (0, 0))
+            by_class[owner] = (count + diff.count_diff, size + diff.size_diff)
+
+    def _finish_capture(self):
+        blocks, collections, pause = self._capture_stats
+        ticks = self.capture_ticks
+        by_line, by_class = self._capture_lines, self._capture_classes
+        self._capture_lines = self._capture_classes = None
+        gen_collections = [now - before for now, before in zip(self._collections, collections)]
+        lines = [f'allocations over {ticks} ticks: {(sys.getallocatedblocks() - blocks) / ticks:+.1f} blocks/tick, '
+                 f'gc collections {gen_collections}, gc pause {self._gc_pause - pause:.2f} ms',
+                 'by line (allocated blocks/tick, bytes/tick):']
+        for line, (count, size) in sorted(by_line.items(), key=lambda item: -item[1][1])[:self.top]:
+            lines.append(f'  {line:<40}{count / ticks:9.2f}{size / ticks:11.1f}')
+        lines.append('by class:')
+        for owner, (count, size) in sorted(by_class.items(), key=lambda item: -item[1][1])[:self.top]:
+            lines.append(f'  {owner:<40}{count / ticks:9.2f}{size / ticks:11.1f}')
+        self.last_report = '\n'.join(lines)
+        print(self.last_report, file=self.output)
+        telemetry = getattr(self.frame, 'telemetry', None)
+        if telemetry is not None:
+            telemetry.emit('alloc_capture', ticks, {owner: size // ticks for owner, (_, size) in by_class.items()})
+
+    def _owner(self, traceback) -> str:
+        # nearest spritelib frame decides the class; allocations outside it are grouped by file
+        for frame in reversed(traceback):
+            if os.path.basename(frame.filename) == self.class_module:
+                owner = class_for_line(frame.filename, frame.lineno)
+                return owner if owner is not None else f'{self.class_module} (module)'
+        return os.path.basename(traceback[-1].filename)
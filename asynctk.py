@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import _tkinter
+from tkinter import Tk
+
+
+class AsyncTkRunner:
+    # drives Tk from an asyncio loop so Tk callbacks and coroutines share one thread
+
+    def __init__(self, root: Tk, interval: float = 0.002, max_events: int = 200) -> None:
+        super().__init__()
+        self.root = root
+        self.interval = interval
+        self.max_events = max_events
+        self._loop = None
+        self._stopping = False
+        self._tasks = set()
+
+    @property
+    def running(self):
+        return self._loop is not None
+
+    @property
+    def loop(self):
+        return self._loop
+
+    def stop(self):
+        self._stopping = True
+
+    def submit(self, coro) -> asyncio.Task:
+        # safe to call from Tk callbacks; they run on the loop's thread
+        if self._loop is None:
+            raise RuntimeError('AsyncTkRunner is not running')
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def pump(self) -> int:
+        # handle pending Tk events and due after() callbacks without blocking
+        dooneevent = self.root.tk.dooneevent
+        handled = 0
+        while handled < self.max_events and dooneevent(_tkinter.ALL_EVENTS | _tkinter.DONT_WAIT):
+            handled += 1
+        return handled
+
+    def _on_destroy(self, evt):
+        if evt.widget is self.root:
+            self.stop()
+
+    async def run(self, main=None):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        self.root.bind('<Destroy>', self._on_destroy, add='+')
+        if main is not None:
+            self.submit(main)
+        try:
+            while not self._stopping:
+                self.pump()
+                # Tk timers and input are serviced at most `interval` late
+                await asyncio.sleep(self.interval)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._loop = None
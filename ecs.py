@@ -0,0 +1,503 @@
+from __future__ import annotations
+
+from array import array
+
+from spritelib import Sprite, Mover, Animation, Jumper, Direction, PlatformIndex, \
+    AnimatedMovingSprite, AnimatedHorizontalMovingSprite, Animated4WayMovingSprite, \
+    AnimatedHorizontalBouncer, AnimatedHorizontalRepeater, AnimatedVerticalBouncer, \
+    AnimatedVerticalRepeater, AnimatedPlatformer, image_size
+
+# bounds policies
+BOUNDS_NONE = 0
+BOUNDS_CLAMP = 1
+BOUNDS_CLAMP_X = 2
+BOUNDS_BOUNCE_X = 3
+BOUNDS_WRAP_X = 4
+BOUNDS_BOUNCE_Y = 5
+BOUNDS_WRAP_Y = 6
+
+# axes a mover may move along
+AXES_X = 1
+AXES_Y = 2
+AXES_XY = 3
+
+HAS_MOVER = 1
+HAS_ANIMATION = 2
+HAS_JUMPER = 4
+DRAWN = 8
+GROUNDED = 16  # lands on the bottom limit, like AnimatedPlatformer
+
+_DIRECTIONS = list(Direction)
+_CODES = {d: i for i, d in enumerate(_DIRECTIONS)}
+_LEFT = _CODES[Direction.LEFT]
+_RIGHT = _CODES[Direction.RIGHT]
+_UP = _CODES[Direction.UP]
+_DOWN = _CODES[Direction.DOWN]
+_DX = [{Direction.LEFT: -1, Direction.RIGHT: 1}.get(d, 0) for d in _DIRECTIONS]
+_DY = [{Direction.UP: -1, Direction.DOWN: 1}.get(d, 0) for d in _DIRECTIONS]
+_AXIS = [AXES_X if dx else AXES_Y if dy else 0 for dx, dy in zip(_DX, _DY)]
+
+_INT_COLUMNS = ('x', 'y', 'width', 'height', 'delay_time', 'speed', 'move_elapsed',
+                'left_limit', 'right_limit', 'top_limit', 'bottom_limit',
+                'frame', 'frame_elapsed', 'frame_delay', 'frame_steps', 'animation_list',
+                'left_list', 'up_list', 'right_list', 'down_list',
+                'jump_elapsed', 'vertical_delay_time')
+_BYTE_COLUMNS = ('alive', 'flags', 'direction', 'axes', 'bounds', 'paused', 'is_jumping')
+_FLOAT_COLUMNS = ('vertical_speed', 'jump_ability', 'gravity')
+_OBJECT_COLUMNS = ('image', 'platforms', 'platform_index', 'entity')
+
+# per-direction image list columns, in direction code order
+_DIRECTION_LISTS = tuple({Direction.LEFT: 'left_list', Direction.UP: 'up_list', Direction.RIGHT: 'right_list',
+                          Direction.DOWN: 'down_list'}.get(d) for d in _DIRECTIONS)
+
+# adoptable classes: bounds policy, mover axes, where the limits live, animation steps per update
+_ADOPTABLE = [
+    (AnimatedPlatformer, BOUNDS_CLAMP, AXES_X, lambda e: e.clamper, 1),
+    (Animated4WayMovingSprite, BOUNDS_CLAMP, AXES_XY, lambda e: e._animated_moving_sprite.clamp, 1),
+    (AnimatedMovingSprite, BOUNDS_CLAMP, AXES_XY, lambda e: e.clamp, 1),
+    (AnimatedHorizontalMovingSprite, BOUNDS_CLAMP_X, AXES_XY, lambda e: e, 1),
+    (AnimatedHorizontalBouncer, BOUNDS_BOUNCE_X, AXES_XY, lambda e: e, 1),
+    (AnimatedHorizontalRepeater, BOUNDS_WRAP_X, AXES_XY, lambda e: e, 1),
+    (AnimatedVerticalBouncer, BOUNDS_BOUNCE_Y, AXES_XY, lambda e: e, 2),  # its update() steps twice
+    (AnimatedVerticalRepeater, BOUNDS_WRAP_Y, AXES_XY, lambda e: e, 1),
+]
+
+
+def _column(name: str, convert=None):
+    # property reading/writing one slot of a world column
+    def fget(self):
+        value = getattr(self._world, name)[self._slot]
+        return value if convert is None else convert(value)
+
+    def fset(self, value):
+        getattr(self._world, name)[self._slot] = value
+
+    return property(fget, fset)
+
+
+def _int_column(name: str):
+    def fget(self):
+        return getattr(self._world, name)[self._slot]
+
+    def fset(self, value):
+        getattr(self._world, name)[self._slot] = int(value)
+
+    return property(fget, fset)
+
+
+class World:
+    # struct-of-arrays entity storage: one column per component field, indexed by slot,
+    # and systems that walk each component's slots in bulk
+
+    def __init__(self) -> None:
+        super().__init__()
+        for name in _INT_COLUMNS:
+            setattr(self, name, array('q'))
+        for name in _BYTE_COLUMNS:
+            setattr(self, name, array('B'))
+        for name in _FLOAT_COLUMNS:
+            setattr(self, name, array('d'))
+        for name in _OBJECT_COLUMNS:
+            setattr(self, name, [])
+        self._free = []
+        self._image_lists = []
+        self._image_sizes = []
+        self._image_list_ids = {}
+        self._dirty = True
+        self._movers = array('l')
+        self._jumpers = array('l')
+        self._bounded = array('l')
+        self._animated = array('l')
+        self._drawn = array('l')
+
+    def __len__(self):
+        return len(self.alive) - len(self._free)
+
+    @property
+    def objects(self):
+        # adopted entities, so iter_entities/snapshots still see them
+        return [e for e in self.entity if e is not None]
+
+    def register_images(self, images: list) -> int:
+        key = id(images)
+        list_id = self._image_list_ids.get(key)
+        if list_id is None:
+            list_id = len(self._image_lists)
+            self._image_list_ids[key] = list_id
+            self._image_lists.append(images)
+            self._image_sizes.append([image_size(image) for image in images])
+        return list_id
+
+    def images_of(self, list_id: int):
+        return self._image_lists[list_id] if list_id >= 0 else None
+
+    def _allocate(self) -> int:
+        self._dirty = True
+        if self._free:
+            return self._free.pop()
+        for name in _INT_COLUMNS + _BYTE_COLUMNS:
+            getattr(self, name).append(0)
+        for name in _FLOAT_COLUMNS:
+            getattr(self, name).append(0.0)
+        for name in _OBJECT_COLUMNS:
+            getattr(self, name).append(None)
+        return len(self.alive) - 1
+
+    def spawn(self, x: int = 0, y: int = 0, width: int = 0, height: int = 0, image=None,
+              direction: Direction = Direction.STOPPED, delay_time: int = 100, speed: int = 1,
+              bounds: int = BOUNDS_NONE, limits: tuple = (0, 800, 0, 600), axes: int = AXES_XY,
+              images=None, frame_delay: int = 100, drawn: bool = True) -> int:
+        # images: one list for every direction, or a dict of Direction -> list
+        slot = self._allocate()
+        self.alive[slot] = 1
+        self.flags[slot] = HAS_MOVER | (DRAWN if drawn else 0)
+        self.direction[slot] = _CODES[direction]
+        self.delay_time[slot] = delay_time
+        self.speed[slot] = abs(speed)
+        self.move_elapsed[slot] = 0
+        self.axes[slot] = axes
+        self.bounds[slot] = bounds
+        self.left_limit[slot], self.right_limit[slot], self.top_limit[slot], self.bottom_limit[slot] = limits
+        for name in _DIRECTION_LISTS:
+            if name is not None:
+                getattr(self, name)[slot] = -1
+        self.animation_list[slot] = -1
+        if images is not None:
+            by_direction = images if isinstance(images, dict) else dict.fromkeys(_CODES, images)
+            for d, name in zip(_DIRECTIONS, _DIRECTION_LISTS):
+                if name is not None and by_direction.get(d) is not None:
+                    getattr(self, name)[slot] = self.register_images(by_direction[d])
+            first = by_direction.get(direction) or next(iter(by_direction.values()))
+            self.set_animation(slot, first, frame_delay)
+            image = first[0]
+        self.image[slot] = image
+        if image is not None:
+            width, height = image_size(image)
+        self.x[slot], self.y[slot] = int(x), int(y)
+        self.width[slot], self.height[slot] = width, height
+        return slot
+
+    def set_animation(self, slot: int, images: list, frame_delay: int = 100, steps: int = 1):
+        # steps: Animation.update calls per update, as in the legacy class
+        self.flags[slot] |= HAS_ANIMATION
+        self.animation_list[slot] = self.register_images(images)
+        self.frame[slot] = 0
+        self.frame_elapsed[slot] = 0
+        self.frame_delay[slot] = frame_delay
+        self.frame_steps[slot] = steps
+        self.paused[slot] = 0
+        self._dirty = True
+
+    def set_jumper(self, slot: int, jump_ability: float = -5, vertical_delay_time: int = 10,
+                   gravity: float = .1, platforms=None, grounded: bool = False):
+        self.flags[slot] |= HAS_JUMPER | (GROUNDED if grounded else 0)
+        self.jump_ability[slot] = jump_ability
+        self.vertical_delay_time[slot] = vertical_delay_time
+        self.gravity[slot] = gravity
+        self.vertical_speed[slot] = 0.0
+        self.is_jumping[slot] = 1
+        self.jump_elapsed[slot] = 0
+        if isinstance(platforms, PlatformIndex):
+            self.platforms[slot], self.platform_index[slot] = None, platforms
+        else:
+            self.platforms[slot] = platforms
+            self.platform_index[slot] = None if platforms is None else PlatformIndex(platforms)
+        self._dirty = True
+
+    def despawn(self, slot: int):
+        if not self.alive[slot]:
+            return
+        self.alive[slot] = 0
+        self.flags[slot] = 0
+        for name in _OBJECT_COLUMNS:
+            getattr(self, name)[slot] = None
+        self._free.append(slot)
+        self._dirty = True
+
+    def adopt(self, entity, drawn: bool = False) -> int:
+        # moves an existing spritelib entity into the world; its sprite/mover/animation/jumper
+        # become views of the world's columns, so code holding the entity keeps working.
+        # The world updates it from then on: keep the entity in drawables, not updateables,
+        # or pass drawn=True to have World.draw batch it instead.
+        for cls, bounds, axes, limits_of, steps in _ADOPTABLE:
+            if isinstance(entity, cls):
+                break
+        else:
+            raise TypeError(f'cannot adopt {type(entity).__name__}')
+        sprite, mover, animation = entity.sprite, entity.mover, entity.animation
+        limits = limits_of(entity)
+        slot = self.spawn(sprite.x, sprite.y, sprite.width, sprite.height, sprite.image,
+                          mover.direction, mover.delay_time, mover.speed, bounds,
+                          (getattr(limits, 'left_limit', 0), getattr(limits, 'right_limit', 800),
+                           getattr(limits, 'top_limit', 0), getattr(limits, 'bottom_limit', 600)),
+                          axes, drawn=drawn)
+        self.move_elapsed[slot] = mover.elapsed_time
+        for d, name in zip(_DIRECTIONS, _DIRECTION_LISTS):
+            images = getattr(entity, f'_{d.name.lower()}_images', None)
+            if name is not None and images is not None:
+                getattr(self, name)[slot] = self.register_images(images)
+        self.set_animation(slot, animation.images, animation.frame_delay, steps)
+        self.frame[slot] = animation.current_frame
+        self.frame_elapsed[slot] = animation.elapsed_time
+        self.paused[slot] = animation.paused
+        self.entity[slot] = entity
+        views = {
+            '_sprite': EntitySprite(self, slot, sprite.border_color, sprite.border_width, sprite.fill_color),
+        }
+        views['_mover'] = EntityMover(self, slot, views['_sprite'])
+        views['_animation'] = EntityAnimation(self, slot, views['_sprite'])
+        jumper = getattr(entity, 'jumper', None)
+        if jumper is not None:
+            platforms = jumper.platform_index if jumper.shares_index else jumper.platforms
+            self.set_jumper(slot, jumper.jump_ability, jumper.vertical_delay_time, jumper.gravity,
+                            platforms, grounded=isinstance(entity, AnimatedPlatformer))
+            self.vertical_speed[slot] = jumper.vertical_speed
+            self.is_jumping[slot] = jumper.is_jumping
+            self.jump_elapsed[slot] = jumper.elapsed_time
+            views['_jumper'] = EntityJumper(self, slot, views['_sprite'])
+        for owner in (entity, getattr(entity, '_animated_moving_sprite', None)):
+            for name, view in views.items():
+                if owner is not None and hasattr(owner, name):
+                    setattr(owner, name, view)
+        return slot
+
+    def sprite_of(self, slot: int) -> Sprite:
+        entity = self.entity[slot]
+        return entity.sprite if entity is not None else EntitySprite(self, slot)
+
+    def _index(self):
+        flags, alive = self.flags, self.alive
+        slots = [i for i in range(len(alive)) if alive[i]]
+        self._movers = array('l', [i for i in slots if flags[i] & HAS_MOVER])
+        self._jumpers = array('l', [i for i in slots if flags[i] & HAS_JUMPER])
+        self._bounded = array('l', [i for i in slots if self.bounds[i] != BOUNDS_NONE])
+        self._animated = array('l', [i for i in slots if flags[i] & HAS_ANIMATION])
+        self._drawn = array('l', [i for i in slots if flags[i] & DRAWN])
+        self._dirty = False
+
+    def update(self, delta_time: int):
+        if self._dirty:
+            self._index()
+        self.update_movers(delta_time)
+        self.update_jumpers(delta_time)
+        self.apply_bounds()
+        self.update_animations(delta_time)
+
+    def update_movers(self, delta_time: int):
+        xs, ys, directions, axes = self.x, self.y, self.direction, self.axes
+        delays, speeds, elapsed = self.delay_time, self.speed, self.move_elapsed
+        for i in self._movers:
+            d = directions[i]
+            mask = axes[i]
+            if mask != AXES_XY and not mask & _AXIS[d]:
+                continue
+            e = elapsed[i] + delta_time
+            if e >= delays[i]:
+                e = 0
+                xs[i] += _DX[d] * speeds[i]
+                ys[i] += _DY[d] * speeds[i]
+            elapsed[i] = e
+
+    def update_jumpers(self, delta_time: int):
+        # Jumper.update, for all jumpers at once
+        xs, ys, widths, heights = self.x, self.y, self.width, self.height
+        speeds, jumping, elapsed = self.vertical_speed, self.is_jumping, self.jump_elapsed
+        gravities, delays = self.gravity, self.vertical_delay_time
+        platform_lists, indexes = self.platforms, self.platform_index
+        for i in self._jumpers:
+            index = indexes[i]
+            if index is not None:
+                index.refresh(platform_lists[i])
+            x, y, w, h = xs[i], ys[i], widths[i], heights[i]
+            if index is None or index.query((x, y, x + w, y + h)) is None:
+                jumping[i] = 1
+            if not jumping[i]:
+                continue
+            e = elapsed[i] + delta_time
+            if e >= delays[i]:
+                e = 0
+                v = speeds[i] + gravities[i]
+                step = int(v)
+                platform = None if index is None else index.sweep((x, y, x + w, y + h), step)
+                y += step
+                if platform is None and index is not None:
+                    platform = index.query((x, y, x + w, y + h))
+                if platform is not None:
+                    if v < 0:
+                        v = -v
+                        y = platform.bottom
+                    elif v > 0 and y + h >= platform.top:
+                        jumping[i] = 0
+                        v = 0.0
+                        y = platform.top - h
+                else:
+                    jumping[i] = 1
+                ys[i] = y
+                speeds[i] = v
+            elapsed[i] = e
+
+    def apply_bounds(self):
+        xs, ys, widths, heights, directions = self.x, self.y, self.width, self.height, self.direction
+        lefts, rights, tops, bottoms = self.left_limit, self.right_limit, self.top_limit, self.bottom_limit
+        policies, flags = self.bounds, self.flags
+        for i in self._bounded:
+            policy = policies[i]
+            if policy == BOUNDS_CLAMP or policy == BOUNDS_CLAMP_X:
+                if xs[i] < lefts[i]:
+                    xs[i] = lefts[i]
+                elif xs[i] + widths[i] > rights[i]:
+                    xs[i] = rights[i] - widths[i]
+                if policy == BOUNDS_CLAMP:
+                    if ys[i] < tops[i]:
+                        ys[i] = tops[i]
+                    elif ys[i] + heights[i] > bottoms[i]:
+                        ys[i] = bottoms[i] - heights[i]
+                    if flags[i] & GROUNDED and ys[i] + heights[i] == bottoms[i]:
+                        self.is_jumping[i] = 0
+                        self.vertical_speed[i] = 0.0
+            elif policy == BOUNDS_BOUNCE_X:
+                if directions[i] == _LEFT and xs[i] < lefts[i]:
+                    xs[i] = lefts[i]
+                    directions[i] = _RIGHT
+                elif directions[i] == _RIGHT and xs[i] + widths[i] > rights[i]:
+                    xs[i] = rights[i] - widths[i]
+                    directions[i] = _LEFT
+            elif policy == BOUNDS_WRAP_X:
+                if directions[i] == _LEFT and xs[i] + widths[i] < lefts[i]:
+                    xs[i] = rights[i]
+                elif directions[i] == _RIGHT and xs[i] > rights[i]:
+                    xs[i] = lefts[i] - widths[i]
+            elif policy == BOUNDS_BOUNCE_Y:
+                if directions[i] == _UP and ys[i] < tops[i]:
+                    ys[i] = tops[i]
+                    directions[i] = _DOWN
+                elif directions[i] == _DOWN and ys[i] + heights[i] > bottoms[i]:
+                    ys[i] = bottoms[i] - heights[i]
+                    directions[i] = _UP
+            elif policy == BOUNDS_WRAP_Y:
+                if directions[i] == _UP and ys[i] + heights[i] < tops[i]:
+                    ys[i] = bottoms[i]
+                elif directions[i] == _DOWN and ys[i] > bottoms[i]:
+                    ys[i] = tops[i] - heights[i]
+
+    def update_animations(self, delta_time: int):
+        # picks the image list for the current direction, then Animation.update;
+        # image sizes come from the registration cache instead of Tk calls
+        directions, current, frames, elapsed = self.direction, self.animation_list, self.frame, self.frame_elapsed
+        delays, steps, paused, images = self.frame_delay, self.frame_steps, self.paused, self.image
+        widths, heights = self.width, self.height
+        lists, sizes = self._image_lists, self._image_sizes
+        by_direction = [None if name is None else getattr(self, name) for name in _DIRECTION_LISTS]
+        for i in self._animated:
+            column = by_direction[directions[i]]
+            if column is not None and column[i] >= 0:
+                current[i] = column[i]
+            if paused[i]:
+                elapsed[i] = 0
+                continue
+            list_id = current[i]
+            frame_list = lists[list_id]
+            e = elapsed[i]
+            f = frames[i]
+            for _ in range(steps[i]):
+                e += delta_time
+                if e > delays[i]:
+                    e = 0
+                    f += 1
+                if f >= len(frame_list):
+                    f = 0
+            elapsed[i] = e
+            frames[i] = f
+            image = frame_list[f]
+            if image is not images[i]:
+                images[i] = image
+                widths[i], heights[i] = sizes[list_id][f]
+
+    def draw(self, canvas):
+        # entities spawned directly in the world, in one Tcl round trip (adopted ones draw themselves)
+        if self._dirty:
+            self._index()
+        if not self._drawn:
+            return
+        path = str(canvas)
+        scale = getattr(canvas, 'scale', 1.0)
+        ox, oy = getattr(canvas, 'origin_x', 0), getattr(canvas, 'origin_y', 0)
+        image_for = getattr(canvas, 'image_for', None) if scale != 1.0 else None
+        xs, ys, images = self.x, self.y, self.image
+        script = []
+        for i in self._drawn:
+            image = images[i]
+            if image is None:
+                continue
+            if image_for is not None:
+                image = image_for(image)
+            script.append('%s create image %d %d -anchor nw -image %s'
+                          % (path, (xs[i] - ox) * scale, (ys[i] - oy) * scale, image))
+        if script:
+            canvas.tk.eval('\n'.join(script))
+
+
+class EntitySprite(Sprite):
+    # Sprite whose position, size and image live in a World; the state is not copied,
+    # so Sprite.__init__ is not run
+    x = _int_column('x')
+    y = _int_column('y')
+    _width = _int_column('width')
+    _height = _int_column('height')
+    _image = _column('image')
+
+    def __init__(self, world: World, slot: int, border_color: str = 'black', border_width: int = 0,
+                 fill_color: str = '') -> None:
+        self._world = world
+        self._slot = slot
+        self.border_color = border_color
+        self.border_width = border_width
+        self.fill_color = fill_color
+
+    @property
+    def slot(self):
+        return self._slot
+
+
+class EntityMover(Mover):
+    _direction = property(lambda self: _DIRECTIONS[self._world.direction[self._slot]],
+                          lambda self, value: self._world.direction.__setitem__(self._slot, _CODES[value]))
+    _delay_time = _int_column('delay_time')
+    _speed = _int_column('speed')
+    _elapsed_time = _int_column('move_elapsed')
+
+    def __init__(self, world: World, slot: int, sprite: EntitySprite) -> None:
+        self._world = world
+        self._slot = slot
+        self._sprite = sprite
+
+
+class EntityAnimation(Animation):
+    _images = property(lambda self: self._world.images_of(self._world.animation_list[self._slot]),
+                       lambda self, value: self._world.animation_list.__setitem__(
+                           self._slot, self._world.register_images(value)))
+    _frame_delay = _int_column('frame_delay')
+    _current_frame = _int_column('frame')
+    _elapsed_time = _int_column('frame_elapsed')
+    _paused = _column('paused', bool)
+
+    def __init__(self, world: World, slot: int, sprite: EntitySprite) -> None:
+        self._world = world
+        self._slot = slot
+        self._sprite = sprite
+
+
+class EntityJumper(Jumper):
+    _vertical_speed = _column('vertical_speed')
+    _jump_ability = _column('jump_ability')
+    _vertical_delay_time = _int_column('vertical_delay_time')
+    _gravity = _column('gravity')
+    _is_jumping = _column('is_jumping', bool)
+    _elapsed_time = _int_column('jump_elapsed')
+    _platforms = _column('platforms')
+    _platform_index = _column('platform_index')
+
+    def __init__(self, world: World, slot: int, sprite: EntitySprite) -> None:
+        self._world = world
+        self._slot = slot
+        self._sprite = sprite
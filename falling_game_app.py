@@ -1,10 +1,23 @@
-from tkinter import *
-from game_gui_lib import *
-from spritelib import *
-
+from startuptrace import startup_trace
 
+import os
+import sys
+from game_gui_lib import MyApp
 
+startup_trace.mark('imports')
 
 root = MyApp()
 
-root.mainloop()
+telemetry_writer = None
+if os.environ.get('FALLING_GAME_TELEMETRY'):
+    from telemetry import TelemetryWriter
+    telemetry_writer = TelemetryWriter(root.telemetry, os.environ['FALLING_GAME_TELEMETRY'])
+    telemetry_writer.start()
+
+if '--asyncio' in sys.argv:
+    root.run_async()
+else:
+    root.mainloop()
+
+if telemetry_writer is not None:
+    telemetry_writer.stop()
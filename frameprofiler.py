@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from time import strftime
+
+from allocprofile import class_for_line
+
+
+def _label(code) -> str:
+    return f'{os.path.basename(code.co_filename)}:{getattr(code, "co_qualname", code.co_name)}'
+
+
+class FrameProfiler:
+    # hotkey driven capture of the next `ticks` ticks of a live game. 'cprofile' writes a pstats
+    # file (snakeviz, gprof2dot, pstats); 'sample' polls the stacks of the Tk and simulation
+    # threads and writes collapsed stacks for flamegraph.pl / speedscope. Both also write the
+    # time per spritelib class. Files are written on a background thread, the game keeps running.
+
+    def __init__(self, frame, ticks: int = 120, mode: str = 'cprofile', interval: float = 0.001,
+                 directory: str = '.', class_module: str = 'spritelib.py', output=None) -> None:
+        super().__init__()
+        if mode not in ('cprofile', 'sample'):
+            raise ValueError(f'unknown profile mode {mode}')
+        self.frame = frame
+        self.ticks = ticks
+        self.mode = mode
+        self.interval = interval
+        self.directory = directory
+        self.class_module = class_module
+        self.output = output if output is not None else sys.stderr
+        self.last_path = None
+        self._left = 0
+        self._profile = None
+        self._stacks = None
+        self._classes = None
+        self._sampler = None
+        self._sampling = None
+
+    @property
+    def capturing(self) -> bool:
+        return bool(self._left)
+
+    def capture(self, evt=None):
+        if self._left:
+            return
+        self._left = self.ticks
+        self.frame.tick_listeners.append(self)
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()  # this (Tk) thread only
+        else:
+            threads = [threading.get_ident()]
+            simulation = getattr(self.frame, 'simulation', None)
+            if simulation is not None and simulation._thread is not None:
+                threads.append(simulation._thread.ident)
+            self._stacks = Counter()
+            self._classes = Counter()
+            self._sampling = threading.Event()
+            self._sampler = threading.Thread(target=self._sample,
+                                             args=(threads, self._stacks, self._classes, self._sampling),
+                                             name='frame sampler', daemon=True)
+            self._sampler.start()
+
+    def __call__(self, frame):
+        self._left -= 1
+        if self._left <= 0:
+            self._left = 0
+            self._finish()
+
+    def _sample(self, threads: list, stacks: Counter, classes: Counter, stop: threading.Event):
+        # a sample counts for the innermost spritelib class on its stack, else its top file
+        labels = {}  # code -> (label, owner or None)
+        while not stop.wait(self.interval):
+            for ident, top in sys._current_frames().items():
+                if ident not in threads:
+                    continue
+                stack = []
+                owner = None
+                while top is not None:
+                    code = top.f_code
+                    known = labels.get(code)
+                    if known is None:
+                        in_module = os.path.basename(code.co_filename) == self.class_module
+                        known = labels[code] = (_label(code), self._owner(code.co_filename, code.co_firstlineno)
+                                                if in_module else None)
+                    stack.append(known[0])
+                    if owner is None and known[1] is not None:
+                        owner = known[1]
+                    top = top.f_back
+                stacks[';'.join(reversed(stack))] += 1
+                classes[owner if owner is not None else stack[0].split(':', 1)[0]] += 1
+
+    def _finish(self):
+        self.frame.tick_listeners.remove(self)
+        base = os.path.join(self.directory, f'profile_{strftime("%Y%m%d_%H%M%S")}_{self.mode}')
+        if self.mode == 'cprofile':
+            profile, self._profile = self._profile, None
+            profile.disable()
+            job = (self._write_pstats, profile, base)
+        else:
+            self._sampling.set()
+            self._sampler.join()
+            job = (self._write_folded, (self._stacks, self._classes), base)
+            self._stacks = self._classes = None
+        threading.Thread(target=self._write, args=job, name='profile writer', daemon=True).start()
+
+    def _write(self, write, data, base: str):
+        path, by_class = write(data, base)
+        lines = [f'{self.mode} profile of {self.ticks} ticks written to {path}', 'by class:']
+        total = sum(by_class.values()) or 1
+        for owner, amount in by_class.most_common(15):
+            lines.append(f'  {owner:<40}{100 * amount / total:6.1f}%')
+        report = '\n'.join(lines)
+        with open(base + '.classes.txt', 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        print(report, file=self.output)
+        self.last_path = path
+        telemetry = getattr(self.frame, 'telemetry', None)
+        if telemetry is not None:
+            telemetry.emit('profile_capture', self.mode, self.ticks, path)
+
+    def _owner(self, filename: str, lineno: int) -> str:
+        if filename == '~':
+            return 'builtins'
+        if os.path.basename(filename) == self.class_module:
+            owner = class_for_line(filename, lineno)
+            return owner if owner is not None else f'{self.class_module} (module)'
+        return os.path.basename(filename) or filename
+
+    def _write_pstats(self, profile: cProfile.Profile, base: str) -> tuple:
+        stats = pstats.Stats(profile)
+        path = base + '.pstats'
+        stats.dump_stats(path)
+        by_class = Counter()
+        for (filename, lineno, _), (_, _, tottime, _, _) in stats.stats.items():
+            by_class[self._owner(filename, lineno)] += tottime
+        return path, by_class
+
+    def _write_folded(self, samples: tuple, base: str) -> tuple:
+        stacks, by_class = samples
+        path = base + '.folded'
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.items():
+                f.write(f'{stack} {count}\n')
+        return path, by_class
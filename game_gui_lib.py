@@ -1,44 +1,115 @@
 from __future__ import annotations
 
-import tkinter
-from time import time_ns
-from imagehelper import *
-from spritelib import *
-from nonblockingdelay import *
+import os
+import threading
+import weakref
+from tkinter import Tk, Frame, Button, Label
+from time import time_ns, perf_counter
+from imagehelper import ImageHelper
+from spritelib import Sprite, Direction, AnimatedHorizontalMovingSprite, AnimatedRandomFallingObjects, \
+    RenderLayers, iter_entities, prime_image_sizes
+from governor import QualityGovernor
+from latency import InputLatencyProbe
+from particles import ParticleEmitter
+from snapshot import GameSnapshot
+from telemetry import TelemetryEmitter
+from startuptrace import startup_trace
+from scaling import ScaledCanvas, VariantCache
+from simthread import SimulationThread, RenderSnapshot, freeze
+
+
+def wall_clock_ms() -> int:
+    return time_ns() // 1_000_000
 
 
 class MyApp(Tk):
 
     def __init__(self, screenName=None, baseName=None, className='Tk',
-                 useTk=True, sync=False, use=None) -> None:
+                 useTk=True, sync=False, use=None, width: int = 800, height: int = 600) -> None:
         super().__init__(screenName, baseName, className, useTk, sync, use)
-        self.geometry('800x600')
-        container = Frame(self)
-        container.pack(fill='both', expand=True, side='top')
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
-        splash = SplashScreen(container, self)
-        splash.grid(row=0, column=0, sticky='news')
-        instructions = InstructionScreen(container, self)
-        instructions.grid(row=0, column=0, sticky='news')
-        playgame = FallingObjectGameFrame(container, self)
-        playgame.grid(row=0, column=0, sticky='news')
-        gameover = GameOverScreen(container, self)
-        gameover.grid(row=0, column=0, sticky='news')
-        mainmenu = MainScreen(container,self)
-        mainmenu.grid(row=0, column=0, sticky='news')
-        self.frames = {
-            'splash': splash,
-            'playgame': playgame,
-            'instructions': instructions,
-            'gameover': gameover,
-            'mainmenu': mainmenu
+        self.async_runner = None
+        self.telemetry = TelemetryEmitter()
+        self.geometry(f'{width}x{height}')
+        self.container = Frame(self)
+        self.container.pack(fill='both', expand=True, side='top')
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        # screens are built on first use so only the splash is paid for before the first frame
+        self.screen_classes = {
+            'splash': SplashScreen,
+            'playgame': FallingObjectGameFrame,
+            'instructions': InstructionScreen,
+            'gameover': GameOverScreen,
+            'mainmenu': MainScreen
         }
+        self.frames = {}
+        self.current_frame = None
+        # animated screens stop ticking while the window is minimized
+        self.bind('<Unmap>', lambda evt: self._window_visibility(evt, False), add='+')
+        self.bind('<Map>', lambda evt: self._window_visibility(evt, True), add='+')
         self.show_frame('splash')
+        startup_trace.mark('window built')
+        startup_trace.watch_first_paint(self.frames['splash'])
+        startup_trace.after_first_paint(lambda: self.after(1, self.preload_frame, 'playgame'))
+
+    def get_frame(self, frame_name: str):
+        frame = self.frames.get(frame_name)
+        if frame is None:
+            frame = self.screen_classes[frame_name](self.container, self)
+            frame.grid(row=0, column=0, sticky='news')
+            self.frames[frame_name] = frame
+            # screens start hidden, show_frame() calls on_show
+            if hasattr(frame, 'on_hide'):
+                frame.on_hide()
+        return frame
+
+    def preload_frame(self, frame_name: str):
+        if frame_name not in self.frames:
+            self.get_frame(frame_name).lower()
 
     def show_frame(self, frame_name: str):
-        frame = self.frames[frame_name]
+        frame = self.get_frame(frame_name)
+        previous = self.current_frame
         frame.tkraise()
+        if frame is previous:
+            return
+        self.current_frame = frame
+        if hasattr(previous, 'on_hide'):
+            previous.on_hide()
+        if hasattr(frame, 'on_show'):
+            frame.on_show()
+
+    def _window_visibility(self, evt, visible: bool):
+        # <Map>/<Unmap> bound on the root also fire for every child widget
+        if evt.widget is not self:
+            return
+        for frame in self.frames.values():
+            if hasattr(frame, 'suspend'):
+                if visible:
+                    frame.resume('window')
+                else:
+                    frame.suspend('window')
+
+    def run_async(self, main=None, interval: float = 0.002):
+        # alternative to mainloop(): Tk is pumped from an asyncio loop, so coroutines
+        # started with submit() can do I/O on the Tk thread without blocking frames
+        import asyncio
+        from asynctk import AsyncTkRunner
+        self.async_runner = AsyncTkRunner(self, interval)
+        try:
+            asyncio.run(self.async_runner.run(main))
+        finally:
+            self.async_runner = None
+
+    def submit(self, coro):
+        if self.async_runner is None:
+            raise RuntimeError('submit() needs the app to be started with run_async()')
+        return self.async_runner.submit(coro)
+
+    def quit(self):
+        if self.async_runner is not None:
+            self.async_runner.stop()
+        super().quit()
 
 
 class InstructionScreen(Frame):
@@ -119,64 +190,265 @@ class GameOverScreen(Frame):
 class AnimatedGameFrame(Frame):
     def __init__(
             self, master=None, delay_time: int = 8, canvas_width: int = 800, canvas_height: int = 600,
-            canvas_bg: str = 'white', paused: bool = False):
+            canvas_bg: str = 'white', paused: bool = False, scalable: bool = False):
         super().__init__(master)
         self.delay_time = delay_time
-        self.drawables = []
+        self._layers = RenderLayers()
         self.updateables = []
-        self.current_time = time_ns() // 1_000_000
+        self.tick_listeners = []
+        self.decorations = []
+        self.show_decorations = True
+        self.render_interval = 1
+        self.tick_count = 0
+        self.frame_cost = 0.0
+        self._base_frame_delays = weakref.WeakKeyDictionary()
+        self.clock = wall_clock_ms  # swapped for a virtual clock by the soak harness
+        self.current_time = self.clock()
         self.delta_time = 0
-        self.canvas = Canvas(self, width=canvas_width, height=canvas_height, bg=canvas_bg)
+        # canvas_width/canvas_height are the logical size; the canvas maps them to the window
+        self.canvas = ScaledCanvas(self, canvas_width, canvas_height, width=canvas_width, height=canvas_height,
+                                   bg=canvas_bg, highlightthickness=0)
         self.canvas.pack()
         self._paused = paused
         self.canvas_width = canvas_width
         self.canvas_height = canvas_height
+        self.canvas_bg = canvas_bg
+        self.variants = None
+        self._target_scale = 1.0
+        self._resize_after = None
+        self._after_id = None
+        self.master_clock = None  # set by MasterClock.register, which then ticks this frame
+        self.simulation = None  # SimulationThread, see start_simulation_thread
+        self.sim_lock = threading.RLock()  # held by the simulation step; input handlers take it too
+        self._presented = None
+        self._suspended = set()  # reasons the loop is idle while not paused: hidden, window, obscured
+        self.canvas.bind('<Visibility>', self.on_visibility, add='+')
+        if scalable:
+            self.variants = VariantCache(self)
+            self.bind('<Configure>', self.on_resize, add='+')
+
+    @property
+    def drawables(self) -> RenderLayers:
+        # drawn in z order; assigning a list puts it into layers
+        return self._layers
+
+    @drawables.setter
+    def drawables(self, value):
+        self._layers = value if isinstance(value, RenderLayers) else RenderLayers(value)
 
     def start(self):
         if self._paused:
             self._paused = False
-            self.animate()
+            self._run()
 
     def stop(self):
         self._paused = True
+        self._cancel()
 
     @property
     def is_paused(self):
         return self._paused
 
+    @property
+    def is_suspended(self):
+        return bool(self._suspended)
+
+    @property
+    def is_running(self):
+        return not self._paused and not self._suspended
+
+    def suspend(self, reason: str = 'hidden'):
+        # no after() callback stays scheduled while suspended, the frame costs no CPU
+        self._suspended.add(reason)
+        self._cancel()
+
+    def resume(self, reason: str = 'hidden'):
+        self._suspended.discard(reason)
+        self._run()
+
+    def on_show(self):
+        self.resume('hidden')
+
+    def on_hide(self):
+        self.suspend('hidden')
+
+    def on_visibility(self, evt):
+        if evt.state == 'VisibilityFullyObscured':
+            self.suspend('obscured')
+        else:
+            self.resume('obscured')
+
+    def set_master_clock(self, master_clock):
+        # with a MasterClock the frame is ticked by it, None goes back to its own after() loop
+        self._cancel()
+        self.master_clock = master_clock
+        self._run()
+
+    def start_simulation_thread(self, step_ms: int = None):
+        # update() runs on a worker at a fixed rate, the after() loop only draws its snapshots
+        if self.master_clock is not None:
+            raise RuntimeError('a frame ticked by a MasterClock cannot run its own simulation thread')
+        if self.simulation is None:
+            # the worker must not make Tcl calls: frame sizes are cached here, on the Tk thread
+            prime_image_sizes(iter_entities(list(self.updateables) + list(self.drawables)))
+            self.simulation = SimulationThread(self, step_ms)
+            self.simulation.start()
+            self.simulation.wake()
+
+    def stop_simulation_thread(self):
+        if self.simulation is not None:
+            self.simulation.stop()
+            self.simulation = None
+            self._presented = None
+            self.current_time = self.clock()
+
+    def _run(self):
+        if self.simulation is not None:
+            self.simulation.wake()
+        if self._paused or self._suspended or self._after_id is not None:
+            return
+        if self.master_clock is not None:
+            self.master_clock.wake()
+            self.current_time = self.clock()
+            return
+        # time spent paused or hidden is not simulated
+        self.current_time = self.clock()
+        self._after_id = self.after_idle(self.animate)
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
     def update(self):
         last_time = self.current_time
-        self.current_time = time_ns() // 1_000_000
+        self.current_time = self.clock()
         self.delta_time = self.current_time - last_time
         for u in self.updateables:
             u.update(self.delta_time)
 
+    def render_state(self) -> dict:
+        # plain values the HUD draws, copied into every snapshot when simulating on a thread
+        return {}
+
+    @property
+    def presented(self) -> dict:
+        # render_state() as of the snapshot being drawn
+        if self._presented is not None:
+            return self._presented.state
+        return self.render_state()
+
+    def capture_render_state(self, cost: float = 0.0) -> RenderSnapshot:
+        # called with sim_lock held, right after step()
+        self._layers.refresh()
+        return RenderSnapshot(self.tick_count, cost, tuple((d, freeze(d)) for d in self.drawables),
+                              self.render_state())
+
     def draw(self):
-        self.canvas.delete('all')
-        for d in self.drawables:
-            d.draw(self.canvas)
+        # items tagged 'retained' (sprite groups) persist across frames
+        self.canvas.delete('!retained')
+        skipped = () if self.show_decorations else self.decorations
+        if self._presented is not None:
+            for source, d in self._presented.layers:
+                if source not in skipped:
+                    d.draw(self.canvas)
+        else:
+            self._layers.refresh()
+            for d in self._layers:
+                if d not in skipped:
+                    d.draw(self.canvas)
+        if self.canvas.missing_variants and self.variants is not None:
+            # images loaded since the scale was applied are rendered in the background too
+            self.canvas.missing_variants = False
+            self.variants.request(self.canvas.scale, self._apply_variants)
+
+    def on_resize(self, evt):
+        # debounced: a window drag fires <Configure> for every intermediate size
+        if evt.widget is not self:
+            return
+        if self._resize_after is not None:
+            self.after_cancel(self._resize_after)
+        self._resize_after = self.after(150, self.rescale, evt.width, evt.height)
+
+    def rescale(self, width: int, height: int):
+        self._resize_after = None
+        scale = min(width / self.canvas_width, height / self.canvas_height)
+        scale = max(0.25, round(scale * 20) / 20)  # 5% steps keep the variant cache small
+        self._target_scale = scale
+        if scale == self.canvas.scale:
+            return
+        if scale == 1.0 or self.variants is None:
+            self.canvas.set_scale(1.0, None)
+        else:
+            # keep drawing at the old scale until every frame has a variant
+            self.variants.request(scale, self._apply_variants)
+
+    def _apply_variants(self, scale: float, variants):
+        if scale == self._target_scale:
+            self.canvas.set_scale(scale, variants)
+
+    def apply_quality(self, level):
+        self.render_interval = level.render_interval
+        self.show_decorations = level.decorations
+        with self.sim_lock:
+            for entity in iter_entities(self.updateables):
+                animation = getattr(entity, 'animation', None)
+                if animation is None:
+                    continue
+                base = self._base_frame_delays.setdefault(animation, animation.frame_delay)
+                animation.frame_delay = base * level.animation_scale
+
+    def tick(self):
+        if self.simulation is not None:
+            # draws the newest snapshot, nothing when the simulation has not stepped since
+            snapshot = self.simulation.buffer.take()
+            if snapshot is not None:
+                self._presented = snapshot
+                self.present(snapshot.cost)
+            return
+        self.present(self.step())
+
+    def step(self) -> float:
+        # the simulation half of a tick, returns the seconds it took
+        began = perf_counter()
+        self.update()
+        self.tick_count += 1
+        return perf_counter() - began
+
+    def present(self, update_cost: float = 0.0):
+        began = perf_counter()
+        if self.tick_count % self.render_interval == 0:
+            self.draw()
+        self.frame_cost = (update_cost + perf_counter() - began) * 1000
+        for listener in list(self.tick_listeners):  # a listener may remove itself (profilers)
+            listener(self)
 
     def animate(self):
-        root = self.winfo_toplevel()
-        if not self._paused:
-            self.update()
-            self.draw()
-            root.after(self.delay_time, self.animate)
+        self._after_id = None
+        if not self._paused and not self._suspended:
+            self.tick()
+            if self._after_id is None and not self._paused and not self._suspended:
+                self._after_id = self.after(self.delay_time, self.animate)
 
 
 class SplashScreen(Frame):
     def __init__(self, container: Frame, controller: MyApp):
         super().__init__(container, bg='red')
         self.controller = controller
+        self.bgImg = None
 
-
-        
         self.rowconfigure(0, weight=1)
         self.rowconfigure(1, weight=12)
         self.columnconfigure(index=0, weight=1)
-        label = Label(self, text='Splash Screen', font=("Comic Sans MS", 44),bg='red', image=self.bgImg)
-        label.grid(row=1, column=0, sticky='news')
-        call_later_with_param(3, controller.show_frame,'mainmenu')
+        self.label = Label(self, text='Splash Screen', font=("Comic Sans MS", 44), bg='red', compound='center')
+        self.label.grid(row=1, column=0, sticky='news')
+        startup_trace.after_first_paint(self.load_background)
+        self.after(3000, controller.show_frame, 'mainmenu')
+
+    def load_background(self):
+        # decoded after the first paint, the text splash is up while the jpeg loads
+        self.bgImg = ImageHelper.get_sized_image('images/alien_world_bg.jpg', 800, 600)
+        self.label.configure(image=self.bgImg)
 
 class MainScreen(Frame):
     def __init__(self, container: Frame, controller: MyApp):
@@ -206,10 +478,11 @@ class MainScreen(Frame):
 
 class FallingObjectGameFrame(AnimatedGameFrame):
     def __init__(self, master=None, controller=None, delay_time: int = 8, canvas_width: int = 800,
-                 canvas_height: int = 600, canvas_bg: str = 'white', paused: bool = False):
-        super().__init__(master, delay_time, canvas_width, canvas_height, canvas_bg, paused)
+                 canvas_height: int = 600, canvas_bg: str = 'white', paused: bool = False, scalable: bool = True):
+        super().__init__(master, delay_time, canvas_width, canvas_height, canvas_bg, paused, scalable)
 
         self.controller = controller
+        self.telemetry = controller.telemetry if controller is not None else TelemetryEmitter()
         self.load_assets()
         self.bind_keys()
         self.start_game_message = 'Press Left/Right\nArrows to Begin'
@@ -218,6 +491,7 @@ class FallingObjectGameFrame(AnimatedGameFrame):
         self.lives = 3
         self.points = 0
         self.gameover = False
+        self.pixel_collisions = True  # coins hit on opaque pixels, not on their boxes
         self.stop()
 
         self.bg_sprite = Sprite(0, 0, canvas_width, canvas_height, image=self.bg_image)
@@ -226,13 +500,27 @@ class FallingObjectGameFrame(AnimatedGameFrame):
                                                    self.canvas_width // 2, self.canvas_height - 50, border_width=0)
         self.hero.draw(self.canvas)
         self.coins = AnimatedRandomFallingObjects(self.coin_images, bottom_limit=750)
+        self.particles = ParticleEmitter(self.explosion_images)
 
         self.canvas.create_text(self.canvas_width // 2, self.canvas_height // 2,
                                 font=("Comic Sans MS", self.start_game_message_font_size),
                                 text=self.start_game_message, fill='white')
 
-        self.drawables = [self.bg_sprite, self.hero, self.coins]
-        self.updateables = [self.hero, self.coins]
+        self.drawables = [self.bg_sprite, self.hero, self.coins, self.particles]
+        self.updateables = [self.hero, self.coins, self.particles]
+        self.decorations = [self.bg_sprite, self.particles]
+        self.governor = QualityGovernor(self)
+        self.tick_listeners.append(self.governor)
+        self.latency_probe = InputLatencyProbe(self, lambda: (self.hero.sprite.x, self.hero.sprite.y))
+        self.latency_probe.attach()
+        self.alloc_profiler = None
+        if os.environ.get('FALLING_GAME_ALLOC_PROFILE'):
+            from allocprofile import AllocationProfiler
+            self.alloc_profiler = AllocationProfiler(self)
+            self.alloc_profiler.start()
+        self.frame_profiler = None
+        if os.environ.get('FALLING_GAME_SIM_THREAD'):
+            self.start_simulation_thread()
 
 
     def bind_keys(self):
@@ -244,52 +532,92 @@ class FallingObjectGameFrame(AnimatedGameFrame):
         self.root.bind('a', self.reduce_speed)
         self.root.bind('y', self.reset_game)
         self.root.bind('n', self.quit)
+        self.root.bind('m', self.capture_allocations)
+        self.root.bind('c', self.capture_profile)
+        self.root.bind('l', lambda evt: self.latency_probe.print_report())
 
     def load_assets(self):
-        self.images = ImageHelper.slice_to_list("images/alien.png", 4, 4, 50, 50)
+        self.images = ImageHelper.slice_to_list_native("images/alien.png", 4, 4, 50, 50)
         self.player_images = dict({
             'Left': self.images[4:8],
             'Right': self.images[8:12],
             'Up': self.images[12:16],
             'Down': self.images[0:4]})
-        self.coin_images = ImageHelper.slice_to_list("images/electric_ball_sheet.png", 9, 1, 35, 35)
+        self.coin_images = ImageHelper.slice_to_list_native("images/electric_ball_sheet.png", 9, 1, 35, 35)
         self.bg_image = ImageHelper.get_sized_image('images/moon_bg.jpg', self.canvas_width, self.canvas_height)
+        self.explosion_images = ImageHelper.slice_to_list_native("images/explosion_sheet.png", 14, 1, 24, 24)
 
     def quit(self, evt=None):
         self.root.quit()
 
     def reset_game(self, evt=None):
+        # Tk calls (loading frames, stopping the loop, drawing) stay outside sim_lock, the
+        # simulation thread only waits for the state changes
         print('reset')
         self.load_assets()
-
-        self.lives = 3
-        self.points = 0
-        self.gameover = False
         self.stop()
+        with self.sim_lock:
+            self._reset_game()
 
         self.bg_sprite.draw(self.canvas)
-
-        self.hero.sprite.center_x = self.canvas_width // 2
-
         self.hero.draw(self.canvas)
-        for coin in self.coins.objects:
-            coin.reset_position()
 
         self.canvas.create_text(self.canvas_width // 2, self.canvas_height // 2,
                                 font=("Comic Sans MS", self.start_game_message_font_size),
                                 text=f'Press Left/Right\nArrows to Begin', fill='white')
 
     def speed_up(self, evt):
-
-        self.hero.mover.speed += 2
-        print(self.hero.mover.speed)
-        if self.hero.mover.delay_time > self.delay_time:
-            self.hero.mover.delay_time -= 5
+        with self.sim_lock:
+            self.hero.mover.speed += 2
+            print(self.hero.mover.speed)
+            if self.hero.mover.delay_time > self.delay_time:
+                self.hero.mover.delay_time -= 5
+            self.telemetry.emit('speed', self.hero.mover.speed, self.hero.mover.delay_time)
 
     def reduce_speed(self, evt):
-        if self.hero.mover.speed > 2:
-            self.hero.mover.speed -= 2
-        self.hero.mover.delay_time += 5
+        with self.sim_lock:
+            if self.hero.mover.speed > 2:
+                self.hero.mover.speed -= 2
+            self.hero.mover.delay_time += 5
+            self.telemetry.emit('speed', self.hero.mover.speed, self.hero.mover.delay_time)
+
+    def apply_quality(self, level):
+        super().apply_quality(level)
+        with self.sim_lock:
+            self.coins.active_count = max(1, round(self.coins.number_objects * level.active_fraction))
+        # without the background image the white HUD text needs a dark canvas
+        self.canvas.configure(bg=self.canvas_bg if level.decorations else 'black')
+
+    def capture_allocations(self, evt=None):
+        # report per-tick allocations over the next ticks; only with FALLING_GAME_ALLOC_PROFILE set
+        if self.alloc_profiler is not None:
+            self.alloc_profiler.capture()
+
+    def capture_profile(self, evt=None):
+        # profile the next ticks without pausing; FALLING_GAME_PROFILE=sample for a sampling profile
+        if self.frame_profiler is None:
+            from frameprofiler import FrameProfiler
+            self.frame_profiler = FrameProfiler(self, mode=os.environ.get('FALLING_GAME_PROFILE', 'cprofile'))
+        self.frame_profiler.capture()
+
+    def snapshot(self) -> bytes:
+        with self.sim_lock:
+            return GameSnapshot.capture(self)
+
+    def restore_snapshot(self, data: bytes):
+        with self.sim_lock:
+            GameSnapshot.restore(self, data)
+
+    def _reset_game(self):
+        self.telemetry.emit('reset', self.points)
+        self.lives = 3
+        self.points = 0
+        self.gameover = False
+        self.hero.sprite.center_x = self.canvas_width // 2
+        for coin in self.coins.objects:
+            coin.reset_position()
+        self.particles.images = self.explosion_images
+        self.particles.clear()
 
     def toggle_play(self, evt):
         if self.is_paused:
@@ -300,37 +628,52 @@ class FallingObjectGameFrame(AnimatedGameFrame):
     def direction_handler(self, evt):
         if self.is_paused and not self.gameover:
             self.start()
-        if evt.keysym == 'Left':
-            self.hero.mover.direction = Direction.LEFT
-        elif evt.keysym == 'Right':
-            self.hero.mover.direction = Direction.RIGHT
-        elif evt.keysym == 'Up':
-            self.hero.mover.direction = Direction.UP
-        elif evt.keysym == 'Down':
-            self.hero.mover.direction = Direction.DOWN
+        with self.sim_lock:
+            if evt.keysym == 'Left':
+                self.hero.mover.direction = Direction.LEFT
+            elif evt.keysym == 'Right':
+                self.hero.mover.direction = Direction.RIGHT
+            elif evt.keysym == 'Up':
+                self.hero.mover.direction = Direction.UP
+            elif evt.keysym == 'Down':
+                self.hero.mover.direction = Direction.DOWN
 
     def update(self):
         super().update()
+        self.telemetry.frame(self.delta_time)
 
-        intersections = self.coins.intersects(self.hero.sprite.bbox())
+        if self.pixel_collisions:
+            intersections = self.coins.intersects_sprite(self.hero.sprite)
+        else:
+            intersections = self.coins.intersects(self.hero.sprite.bbox())
         self.points += len(intersections)
+        if intersections:
+            self.telemetry.emit('coin', len(intersections), self.points)
         for obj in intersections:
+            self.particles.burst(obj.sprite.center_x, obj.sprite.center_y)
             obj.reset_position()
-        for coin in self.coins.objects:
+        for coin in self.coins.active_objects:
             if coin.sprite.top > self.canvas_height:
                 self.lives -= 1
+                self.telemetry.emit('life_lost', self.lives)
                 coin.reset_position()
                 if self.lives <= 0:
+                    if not self.gameover:
+                        self.telemetry.emit('game_over', self.points)
                     self.gameover = True
                     self.lives = 0
 
+    def render_state(self) -> dict:
+        return {'lives': self.lives, 'points': self.points, 'gameover': self.gameover}
+
     def draw(self):
         super().draw()
-        self.canvas.create_text(25, 10, font=("Comic Sans MS", 18), text=f'Lives: {self.lives}', anchor="nw",
+        hud = self.presented
+        self.canvas.create_text(25, 10, font=("Comic Sans MS", 18), text=f'Lives: {hud["lives"]}', anchor="nw",
                                 fill='white')
-        self.canvas.create_text(775, 10, font=("Comic Sans MS", 18), text=f'Points: {self.points}', anchor="ne",
+        self.canvas.create_text(self.canvas_width - 25, 10, font=("Comic Sans MS", 18), text=f'Points: {hud["points"]}', anchor="ne",
                                 fill='white')
-        if self.gameover:
+        if hud['gameover']:
             self.canvas.create_text(self.canvas_width // 2, self.canvas_height // 2,
                                     font=("Comic Sans MS", self.game_over_message_font_size),
                                     text=f'Game Over', fill='white')
@@ -339,7 +682,7 @@ class FallingObjectGameFrame(AnimatedGameFrame):
                                     text="Play Again (y/n)?", fill='white')
 
 
-            call_later_with_param(2,self.controller.show_frame, 'gameover')
+            self.after(2000, self.controller.show_frame, 'gameover')
 
 
 
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from collections import deque
+from time import time_ns, perf_counter
+
+
+class QualityLevel:
+    def __init__(self, name: str, animation_scale: int = 1, active_fraction: float = 1.0,
+                 decorations: bool = True, render_interval: int = 1) -> None:
+        super().__init__()
+        self.name = name
+        self.animation_scale = animation_scale
+        self.active_fraction = active_fraction
+        self.decorations = decorations
+        self.render_interval = render_interval
+
+    def __str__(self) -> str:
+        return self.name
+
+
+DEFAULT_LEVELS = [
+    QualityLevel('full'),
+    QualityLevel('slow animation', animation_scale=2),
+    QualityLevel('fewer objects', animation_scale=2, active_fraction=0.5),
+    QualityLevel('no decorations', animation_scale=3, active_fraction=0.5, decorations=False),
+    QualityLevel('half render rate', animation_scale=3, active_fraction=0.5, decorations=False,
+                 render_interval=2),
+]
+
+
+class QualityGovernor:
+    # tick listener: degrades one level after degrade_after slow ticks in a row and
+    # restores one level only after the longer restore_after run of cheap ticks.
+    # A tick costs its measured update and draw, or the whole time since the previous tick
+    # minus the after() delay if that is more: Tk's idle repaint runs between the ticks.
+    # Going up a level that draws more often is judged on the cost scaled to that rate,
+    # so 'half render rate' does not look cheap just because half the ticks skip drawing
+
+    def __init__(self, frame, budget_ms: float = 10.0, levels: list = None,
+                 degrade_after: int = 30, restore_after: int = 300,
+                 high: float = 1.0, low: float = 0.5, smoothing: float = 0.1,
+                 history: int = 100, pause_gap_ms: float = 250.0) -> None:
+        super().__init__()
+        self.frame = frame
+        self.budget_ms = budget_ms
+        self.levels = levels if levels is not None else DEFAULT_LEVELS
+        self.degrade_after = degrade_after
+        self.restore_after = restore_after
+        self.high = high
+        self.low = low
+        self.smoothing = smoothing
+        self.pause_gap_ms = pause_gap_ms  # longer gaps between ticks are pauses, not cost
+        self.events = deque(maxlen=history)
+        self.average_cost = 0.0
+        self._last_tick = None
+        self._level = 0
+        self._slow_ticks = 0
+        self._fast_ticks = 0
+
+    @property
+    def level(self):
+        return self._level
+
+    @property
+    def quality(self):
+        return self.levels[self._level]
+
+    def tick_cost(self, frame) -> float:
+        now = perf_counter()
+        cost = frame.frame_cost
+        if self._last_tick is not None:
+            master_clock = getattr(frame, 'master_clock', None)
+            delay = master_clock.delay_time if master_clock is not None else frame.delay_time
+            busy = (now - self._last_tick) * 1000 - delay
+            if busy < self.pause_gap_ms:
+                cost = max(cost, busy)
+        self._last_tick = now
+        return cost
+
+    def __call__(self, frame):
+        self.average_cost += (self.tick_cost(frame) - self.average_cost) * self.smoothing
+        if self.average_cost > self.budget_ms * self.high:
+            self._slow_ticks += 1
+            self._fast_ticks = 0
+        elif self._restored_cost() < self.budget_ms * self.low:
+            self._fast_ticks += 1
+            self._slow_ticks = 0
+        else:
+            self._slow_ticks = 0
+            self._fast_ticks = 0
+        if self._slow_ticks >= self.degrade_after and self._level < len(self.levels) - 1:
+            self.set_level(self._level + 1)
+        elif self._fast_ticks >= self.restore_after and self._level > 0:
+            self.set_level(self._level - 1)
+
+    def _restored_cost(self) -> float:
+        # average cost projected to the next better level's render rate
+        if self._level == 0:
+            return self.average_cost
+        better = self.levels[self._level - 1]
+        return self.average_cost * self.quality.render_interval / better.render_interval
+
+    def set_level(self, level: int):
+        old = self._level
+        self._level = level
+        self._slow_ticks = 0
+        self._fast_ticks = 0
+        self.events.append((time_ns() // 1_000_000, old, level, round(self.average_cost, 2)))
+        telemetry = getattr(self.frame, 'telemetry', None)
+        if telemetry is not None:
+            telemetry.emit('quality', old, level, round(self.average_cost, 2))
+        self.frame.apply_quality(self.levels[level])
@@ -1,10 +1,204 @@
-from tkinter import *
-from PIL import Image, ImageTk, ImageOps
+import functools
 import os
+import weakref
+from tkinter import PhotoImage
+
+from spritelib import CollisionMask, register_image_size
+from startuptrace import startup_trace
+
+# PIL is imported on first use, it is the heaviest import of the game
+Image = None
+ImageTk = None
+ImageOps = None
+
+
+def _load_pil():
+    global Image, ImageTk, ImageOps
+    if Image is None:
+        with startup_trace.measure('lazy imports'):
+            from PIL import Image, ImageTk, ImageOps
+
+
+def _asset_load(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _load_pil()
+        with startup_trace.measure('assets'):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _decode(path: str):
+    im = Image.open(path)
+    im.load()
+    return im
+
+
+# sprite sheets only: they are sliced several times per load. Whole images (backgrounds) are
+# decoded again when needed, a few of them decoded at full size would take hundreds of MB
+_open_decoded = functools.lru_cache(maxsize=4)(_decode)
+
+
+FLIP_H = 'flip_h'
+FLIP_V = 'flip_v'
+ROT90 = 'rot90'
+ROT180 = 'rot180'
+ROT270 = 'rot270'
+FLASH = ('tint', '#ffffff', 0.85)
+
+
+def tint(color: str, alpha: float = 0.5) -> tuple:
+    # transform for ImageHelper.variant(): blends the frame towards color, keeping its alpha
+    return 'tint', color, alpha
+
+
+def _apply_transform(im, transform):
+    if transform == FLIP_H:
+        return im.transpose(Image.FLIP_LEFT_RIGHT)
+    if transform == FLIP_V:
+        return im.transpose(Image.FLIP_TOP_BOTTOM)
+    if transform == ROT90:
+        return im.transpose(Image.ROTATE_90)
+    if transform == ROT180:
+        return im.transpose(Image.ROTATE_180)
+    if transform == ROT270:
+        return im.transpose(Image.ROTATE_270)
+    if isinstance(transform, tuple) and transform[0] == 'tint':
+        _, color, alpha = transform
+        im = im.convert('RGBA')
+        overlay = Image.new('RGBA', im.size, color)
+        overlay.putalpha(im.getchannel('A'))
+        return Image.blend(im, overlay, alpha)
+    raise ValueError(f'unknown image transform {transform!r}')
+
+
+def _has_alpha(im) -> bool:
+    return im.mode in ('RGBA', 'LA', 'PA') or 'transparency' in im.info
+
+
+def _collision_mask(im, threshold: int):
+    # None for frames without transparency, their box is already exact
+    if threshold is None or not _has_alpha(im):
+        return None
+    width, height = im.size
+    bits = im.convert('RGBA').getchannel('A').point(lambda a: 255 if a >= threshold else 0).convert('1')
+    data = bits.tobytes()  # rows padded to whole bytes, leftmost pixel in the high bit
+    stride = (width + 7) // 8
+    rows = []
+    for y in range(height):
+        row = format(int.from_bytes(data[y * stride:(y + 1) * stride], 'big'), f'0{stride * 8}b')
+        rows.append(int(row[:width][::-1], 2))
+    return CollisionMask(width, height, tuple(rows))
+
+
+def _tk_factor(frame: int, size: int):
+    # (zoom, subsample) when Tk can scale one axis exactly by a whole factor, else None
+    if size >= frame and size % frame == 0:
+        return size // frame, 1
+    if frame % size == 0:
+        return 1, frame // size
+    return None
+
+
+class FrameSource:
+    # how a PhotoImage was made, so it can be rendered again at another size
+
+    def __init__(self, path: str, box: tuple = None, size: tuple = None, transpose: bool = False,
+                 transforms: tuple = ()) -> None:
+        super().__init__()
+        self.path = path
+        self.box = box
+        self.size = size
+        self.transpose = transpose
+        self.transforms = transforms
+
+    def derive(self, transform):
+        return FrameSource(self.path, self.box, self.size, self.transpose, self.transforms + (transform,))
+
+    def render(self, scale: float = 1.0):
+        # safe to call from worker threads, it only touches PIL
+        _load_pil()
+        im = _open_decoded(self.path) if self.box is not None else _decode(self.path)
+        if self.transpose:
+            im = im.transpose(Image.FLIP_LEFT_RIGHT)
+        if self.box is not None:
+            im = im.crop(self.box)
+        width, height = self.size if self.size is not None else im.size
+        im = im.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+        for transform in self.transforms:
+            im = _apply_transform(im, transform)
+        return im
+
+
+# PhotoImage -> FrameSource for everything loaded through ImageHelper
+_sources = weakref.WeakKeyDictionary()
+# PhotoImage -> {transform: derived PhotoImage}
+_variants = weakref.WeakKeyDictionary()
+# PhotoImage -> the PIL frame it was made from (cropped and resized), variants start from it
+_frames = weakref.WeakKeyDictionary()
 
 
 class ImageHelper:
+    # alpha at or above this counts as solid in collision masks; None skips building them
+    mask_threshold = 128
+
+    @classmethod
+    def _register_mask(cls, image, im):
+        mask = _collision_mask(im, cls.mask_threshold)
+        if mask is not None:
+            CollisionMask.register(image, mask)
+
     @classmethod
+    def source_of(cls, image):
+        return _sources.get(image)
+
+    @classmethod
+    def register_source(cls, image, source: FrameSource):
+        _sources[image] = source
+
+    @classmethod
+    def sources(cls) -> list:
+        return list(_sources.items())
+
+    @classmethod
+    def to_photo(cls, pil_image):
+        _load_pil()
+        photo = ImageTk.PhotoImage(pil_image)
+        register_image_size(photo, *pil_image.size)
+        return photo
+
+    @classmethod
+    @_asset_load
+    def variant(cls, image, transform):
+        # derived from the base frame and memoized per (frame, transform), no sheet is re-sliced
+        # or resized; frames made by Tk copies (slice_to_list_native) are read back from Tk once
+        derived = _variants.setdefault(image, {})
+        result = derived.get(transform)
+        if result is None:
+            base = _frames.get(image)
+            if base is None:
+                base = _frames[image] = ImageTk.getimage(image)
+            im = _apply_transform(base, transform)
+            result = ImageTk.PhotoImage(im)
+            register_image_size(result, *im.size)
+            _frames[result] = im
+            source = _sources.get(image)
+            if source is not None:
+                _sources[result] = source.derive(transform)  # for rendering at other scales
+            cls._register_mask(result, im)
+            derived[transform] = result
+        return result
+
+    @classmethod
+    def variants(cls, images: list, transform) -> list:
+        return [cls.variant(image, transform) for image in images]
+
+    @classmethod
+    def mirrored(cls, images: list) -> list:
+        return cls.variants(images, FLIP_H)
+
+    @classmethod
+    @_asset_load
     def slice(cls, img_path: str, destination: str, columns: int, rows: int = 1,transpose:bool=False):
         filename, file_extension = os.path.splitext(img_path)
         if not os.path.isfile(destination):
@@ -34,12 +228,11 @@ class ImageHelper:
                     count += 1
 
     @classmethod
+    @_asset_load
     def slice_to_list(cls, img_path: str, columns: int, rows: int = 1,
                       width:int=32,height:int=32,transpose: bool = False):
         images = []
-        im = Image.open(img_path)
-        if transpose:
-            im = im.transpose(Image.FLIP_LEFT_RIGHT)
+        im = _open_decoded(img_path)
         imgwidth, imgheight = im.size
         frame_height = imgheight // rows
         frame_width = imgwidth // columns
@@ -47,22 +240,87 @@ class ImageHelper:
             for col in range(0, columns):
                 box = (col * frame_width, row * frame_height, (col + 1) * frame_width, (row + 1) * frame_height)
                 a = im.crop(box)
-                a = a.resize((width,height),Image.ANTIALIAS)
+                a = a.resize((width,height),Image.LANCZOS)
+                if a.mode == 'P':
+                    a = a.convert('RGBA')  # PhotoImage would apply the transparency to the kept frame
                 image = ImageTk.PhotoImage(a)
-                if transpose:
-                    images.insert(0, image)
-                else:
-                    images.append(image)
+                register_image_size(image, width, height)
+                _frames[image] = a
+                _sources[image] = FrameSource(img_path, box, (width, height))
+                cls._register_mask(image, a)
+                images.append(image)
+        if transpose:
+            # mirrored frames, rows in reverse order as the flipped sheet used to produce
+            images = [frame for row in range(rows - 1, -1, -1)
+                      for frame in cls.mirrored(images[row * columns:(row + 1) * columns])]
+        return images
+
+    @classmethod
+    @_asset_load
+    def slice_to_list_native(cls, img_path: str, columns: int, rows: int = 1,
+                             width: int = 32, height: int = 32, transpose: bool = False):
+        # same frames as slice_to_list with a single PIL -> Tk transfer per sheet: frames are
+        # region copies of the sheet photo made by Tk. Whole zoom/subsample factors are done
+        # by the copy (nearest neighbour, fine for pixel art); for any other size the frames
+        # are resized by PIL as before but packed into one sheet for the transfer
+        im = _open_decoded(img_path)
+        imgwidth, imgheight = im.size
+        frame_height = imgheight // rows
+        frame_width = imgwidth // columns
+        factor_x, factor_y = _tk_factor(frame_width, width), _tk_factor(frame_height, height)
+        resized = None
+        if factor_x is None or factor_y is None:
+            resized = Image.new('RGBA', (columns * width, rows * height))
+            for row in range(0, rows):
+                for col in range(0, columns):
+                    box = (col * frame_width, row * frame_height, (col + 1) * frame_width, (row + 1) * frame_height)
+                    a = im.crop(box).resize((width, height), Image.LANCZOS)
+                    resized.paste(a.convert('RGBA'), (col * width, row * height))
+            sheet = ImageTk.PhotoImage(resized)
+            step_x, step_y, factor_x, factor_y = width, height, (1, 1), (1, 1)
+        else:
+            # a copy: PhotoImage applies the transparency of P mode images in place, and im is
+            # the cached decode shared with slice_to_list and FrameSource.render
+            sheet = ImageTk.PhotoImage(im.copy())
+            step_x, step_y = frame_width, frame_height
+        masks = cls.mask_threshold is not None and _has_alpha(im)
+        if masks and resized is None:
+            resized = im.resize((columns * width, rows * height), Image.NEAREST)
+        images = []
+        for row in range(0, rows):
+            for col in range(0, columns):
+                image = PhotoImage(width=width, height=height)
+                image.tk.call(image, 'copy', sheet,
+                              '-from', col * step_x, row * step_y, (col + 1) * step_x, (row + 1) * step_y,
+                              '-zoom', factor_x[0], factor_y[0], '-subsample', factor_x[1], factor_y[1])
+                register_image_size(image, width, height)
+                box = (col * frame_width, row * frame_height, (col + 1) * frame_width, (row + 1) * frame_height)
+                _sources[image] = FrameSource(img_path, box, (width, height))
+                if masks:
+                    cls._register_mask(image, resized.crop((col * width, row * height,
+                                                            (col + 1) * width, (row + 1) * height)))
+                images.append(image)
+        if transpose:
+            images = [frame for row in range(rows - 1, -1, -1)
+                      for frame in cls.mirrored(images[row * columns:(row + 1) * columns])]
         return images
 
     @staticmethod
+    @_asset_load
     def get_sized_image(image_file: str, width: int, height: int):
         img = Image.open(image_file)
-        img = img.resize((width, height), Image.ANTIALIAS)
-        img = ImageTk.PhotoImage(img)
-        return img
+        img = img.resize((width, height), Image.LANCZOS)
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        photo = ImageTk.PhotoImage(img)
+        register_image_size(photo, width, height)
+        _frames[photo] = img
+        _sources[photo] = FrameSource(image_file, None, (width, height))
+        ImageHelper._register_mask(photo, img)
+        return photo
 
     @classmethod
+    @_asset_load
     def get_sized_images(cls, image_files: list, width: int, height: int):
         images = []
         for image_name in image_files:
@@ -71,6 +329,7 @@ class ImageHelper:
         return images
 
     @classmethod
+    @_asset_load
     def get_sized_images_in_range(cls, file_path: str, start_number: int,
                                   end_number: int,
                                   extension: str,width: int, height: int):
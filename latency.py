@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+from collections import deque
+from time import perf_counter_ns
+
+
+# the way each key should make the tracked position move
+_KEY_DIRECTIONS = {'Left': (-1, 0), 'Right': (1, 0), 'Up': (0, -1), 'Down': (0, 1)}
+
+
+def _along(motion: tuple, direction: tuple) -> int:
+    return motion[0] * direction[0] + motion[1] * direction[1]
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class InputLatencyProbe:
+    # tick listener timing key input -> first tick where the tracked (x, y) position moved the
+    # way the key asks -> first painted frame showing it (an idle callback queued behind the
+    # canvas redisplay). Presses made while already moving that way change nothing visible
+    # and are only counted as skipped
+
+    def __init__(self, frame, position, keys: tuple = ('Left', 'Right'), history: int = 1000,
+                 timeout_ms: int = 2000, pending_limit: int = 64) -> None:
+        super().__init__()
+        self.frame = frame
+        self.position = position  # callable returning what the input should visibly change
+        self.keys = keys
+        self.timeout_ms = timeout_ms
+        self.tick_latencies = deque(maxlen=history)
+        self.paint_latencies = deque(maxlen=history)
+        self.unresolved = 0
+        self.skipped = 0
+        self._pending = deque(maxlen=pending_limit)
+        self._last_position = None
+        self._motion = (0, 0)  # position change over the last tick
+
+    def attach(self):
+        root = self.frame.winfo_toplevel()
+        for key in self.keys:
+            root.bind(f'<{key}>', self.on_input, add='+')
+        self.frame.tick_listeners.append(self)
+
+    def on_input(self, evt=None):
+        direction = _KEY_DIRECTIONS.get(getattr(evt, 'keysym', None))
+        if direction is None:
+            return
+        if _along(self._motion, direction) > 0:
+            self.skipped += 1
+            return
+        self._pending.append([perf_counter_ns(), direction, None])
+
+    def __call__(self, frame):
+        position = self.position()
+        last, self._last_position = self._last_position, position
+        if last is not None:
+            self._motion = (position[0] - last[0], position[1] - last[1])
+        if not self._pending:
+            return
+        now = perf_counter_ns()
+        drawn = frame.tick_count % frame.render_interval == 0
+        while self._pending:
+            record = self._pending[0]
+            if record[2] is None:
+                if _along(self._motion, record[1]) <= 0:
+                    if now - record[0] > self.timeout_ms * 1_000_000:
+                        # e.g. pushing against a wall, nothing will ever show
+                        self._pending.popleft()
+                        self.unresolved += 1
+                        continue
+                    break
+                record[2] = now
+            if not drawn:
+                break
+            self._pending.popleft()
+            frame.after_idle(self._painted, record)
+
+    def _painted(self, record: list):
+        began, _, ticked = record
+        tick_ms = (ticked - began) / 1_000_000
+        paint_ms = (perf_counter_ns() - began) / 1_000_000
+        self.tick_latencies.append(tick_ms)
+        self.paint_latencies.append(paint_ms)
+        telemetry = getattr(self.frame, 'telemetry', None)
+        if telemetry is not None:
+            telemetry.emit('input_latency', round(tick_ms, 2), round(paint_ms, 2))
+
+    def report(self) -> str:
+        lines = [f'input latency over {len(self.paint_latencies)} inputs ({self.unresolved} never shown, '
+                 f'{self.skipped} already moving that way), ms:']
+        for name, values in (('to tick', self.tick_latencies), ('to paint', self.paint_latencies)):
+            if values:
+                lines.append(f'  {name:<10}p50 {percentile(values, 0.5):7.1f}  p90 {percentile(values, 0.9):7.1f}  '
+                             f'p99 {percentile(values, 0.99):7.1f}  max {max(values):7.1f}')
+        return '\n'.join(lines)
+
+    def print_report(self, evt=None):
+        print(self.report(), file=sys.stderr)
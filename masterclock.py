@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from time import time_ns
+
+
+def _wall_clock_ms() -> int:
+    return time_ns() // 1_000_000
+
+
+class MasterClock:
+    # one after() loop for several AnimatedGameFrames (split screen): every callback reads the
+    # time once, steps all running frames with that same time, then draws them all in one pass.
+    # Registered frames read this clock as their own, so their deltas stay in lockstep.
+
+    def __init__(self, root, delay_time: int = None, source=None) -> None:
+        super().__init__()
+        self.root = root
+        self.delay_time = delay_time
+        self.source = source if source is not None else _wall_clock_ms
+        self.frames = []
+        self.now = self.source()
+        self.tick_count = 0
+        self._own_clocks = {}
+        self._after_id = None
+
+    def __call__(self) -> int:
+        return self.now
+
+    def register(self, frame):
+        if frame in self.frames:
+            return
+        self.frames.append(frame)
+        if self.delay_time is None or frame.delay_time < self.delay_time:
+            self.delay_time = frame.delay_time
+        self._own_clocks[frame] = frame.clock
+        frame.clock = self
+        frame.set_master_clock(self)
+
+    def unregister(self, frame):
+        # the frame goes back to its own loop
+        self.frames.remove(frame)
+        frame.clock = self._own_clocks.pop(frame)
+        frame.set_master_clock(None)
+
+    def wake(self):
+        # called by frames when they start or resume; the loop idles while none is running
+        if self._after_id is None:
+            self.now = self.source()
+            self._after_id = self.root.after_idle(self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        running = [frame for frame in self.frames if frame.is_running]
+        if not running:
+            return
+        self.now = self.source()
+        self.tick_count += 1
+        costs = [frame.step() for frame in running]
+        for frame, cost in zip(running, costs):
+            # a frame may have been paused or hidden by another frame's update
+            if frame.is_running:
+                frame.present(cost)
+        if self._after_id is None and any(frame.is_running for frame in self.frames):
+            self._after_id = self.root.after(self.delay_time, self._tick)
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import struct
+import threading
+import weakref
+from tkinter import Frame, Canvas, NW
+
+from spritelib import iter_sprites
+
+PROTOCOL_VERSION = 1
+NO_IMAGE = 0xFFFF
+
+MSG_HELLO = 1
+MSG_DELTA = 2
+MSG_ACK = 3
+
+_LENGTH = struct.Struct('!I')
+_HELLO = struct.Struct('!BHHH')  # type, version, canvas width, canvas height
+_DELTA = struct.Struct('!BIIII')  # type, tick, base tick, changed count, removed count
+_ENTITY = struct.Struct('!IiiHHH')  # entity id, x, y, width, height, image id
+_REMOVED = struct.Struct('!I')
+_ACK = struct.Struct('!BI')  # type, tick
+
+
+class ImageCatalog:
+    # both ends register the same image lists in the same order so image ids line up
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._images = []
+        self._ids = {}
+
+    def register(self, images: list) -> list:
+        ids = []
+        for image in images:
+            key = id(image)
+            if key not in self._ids:
+                self._ids[key] = len(self._images)
+                self._images.append(image)
+            ids.append(self._ids[key])
+        return ids
+
+    def id_of(self, image) -> int:
+        if image is None:
+            return NO_IMAGE
+        return self._ids.get(id(image), NO_IMAGE)
+
+    def image(self, image_id: int):
+        if 0 <= image_id < len(self._images):
+            return self._images[image_id]
+        return None
+
+
+def _message(body: bytes) -> bytes:
+    return _LENGTH.pack(len(body)) + body
+
+
+def encode_hello(width: int, height: int) -> bytes:
+    return _message(_HELLO.pack(MSG_HELLO, PROTOCOL_VERSION, width, height))
+
+
+def encode_ack(tick: int) -> bytes:
+    return _message(_ACK.pack(MSG_ACK, tick))
+
+
+def encode_delta(tick: int, base_tick: int, base: dict, state: dict) -> bytes:
+    changed = [(eid, record) for eid, record in state.items() if base.get(eid) != record]
+    removed = [eid for eid in base if eid not in state]
+    parts = [_DELTA.pack(MSG_DELTA, tick, base_tick, len(changed), len(removed))]
+    parts.extend(_ENTITY.pack(eid, *record) for eid, record in changed)
+    parts.extend(_REMOVED.pack(eid) for eid in removed)
+    return _message(b''.join(parts))
+
+
+def decode_delta(body: bytes, states: dict):
+    _, tick, base_tick, changed, removed = _DELTA.unpack_from(body)
+    state = dict(states[base_tick]) if base_tick else {}
+    offset = _DELTA.size
+    for _ in range(changed):
+        eid, x, y, width, height, image_id = _ENTITY.unpack_from(body, offset)
+        state[eid] = (x, y, width, height, image_id)
+        offset += _ENTITY.size
+    for _ in range(removed):
+        state.pop(_REMOVED.unpack_from(body, offset)[0], None)
+        offset += _REMOVED.size
+    return tick, base_tick, state
+
+
+async def _read_message(reader: asyncio.StreamReader) -> bytes:
+    length = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))[0]
+    return await reader.readexactly(length)
+
+
+class _ClientSession:
+    def __init__(self) -> None:
+        super().__init__()
+        self.wake = asyncio.Event()
+        self.closed = False
+        self.sent = {}
+        self.sent_tick = 0
+        self.acked_tick = 0
+
+
+class SyncServer:
+    # streams sprite state of an AnimatedGameFrame; append publish to the frame's tick_listeners
+
+    def __init__(self, frame=None, catalog: ImageCatalog = None, host: str = '127.0.0.1',
+                 port: int = 0, path: str = None, history: int = 64) -> None:
+        super().__init__()
+        self.frame = frame
+        self.catalog = catalog if catalog is not None else ImageCatalog()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.history = history
+        self.address = None
+        self._entity_ids = weakref.WeakKeyDictionary()
+        self._next_id = itertools.count(1)
+        self._tick = 0
+        self._latest = (0, {})
+        self._sessions = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def client_count(self):
+        return len(self._sessions)
+
+    def capture(self, frame) -> dict:
+        state = {}
+        catalog = self.catalog
+        for sprite in iter_sprites(frame.drawables):
+            eid = self._entity_ids.get(sprite)
+            if eid is None:
+                eid = next(self._next_id)
+                self._entity_ids[sprite] = eid
+            state[eid] = (int(sprite.x), int(sprite.y), sprite.width, sprite.height,
+                          catalog.id_of(sprite.image))
+        return state
+
+    def publish(self, frame=None):
+        # runs on the Tk thread; only an immutable dict crosses over to the event loop
+        state = self.capture(frame if frame is not None else self.frame)
+        self._tick += 1
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._set_latest, self._tick, state)
+
+    def _set_latest(self, tick: int, state: dict):
+        self._latest = (tick, state)
+        for session in self._sessions:
+            session.wake.set()
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+            self.address = self.path
+        else:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self.address
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for session in list(self._sessions):
+            session.closed = True
+            session.wake.set()
+
+    def start_in_thread(self):
+        ready = threading.Event()
+        loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name='sync-server', daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.address
+
+    def stop(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = _ClientSession()
+        self._sessions.add(session)
+        canvas_width = getattr(self.frame, 'canvas_width', 0)
+        canvas_height = getattr(self.frame, 'canvas_height', 0)
+        acks = asyncio.create_task(self._read_acks(reader, session))
+        try:
+            writer.write(encode_hello(canvas_width, canvas_height))
+            session.wake.set()
+            while True:
+                await session.wake.wait()
+                session.wake.clear()
+                if session.closed:
+                    break
+                tick, state = self._latest
+                if tick == session.sent_tick:
+                    continue
+                base_tick = session.acked_tick
+                base = session.sent.get(base_tick, {})
+                writer.write(encode_delta(tick, base_tick, base, state))
+                session.sent[tick] = state
+                session.sent_tick = tick
+                self._trim_history(session)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._sessions.discard(session)
+            acks.cancel()
+            writer.close()
+
+    def _trim_history(self, session: _ClientSession):
+        # the acked baseline is always kept, everything else only for the last `history` ticks
+        while len(session.sent) > self.history:
+            oldest = next(t for t in session.sent if t != session.acked_tick)
+            del session.sent[oldest]
+
+    async def _read_acks(self, reader: asyncio.StreamReader, session: _ClientSession):
+        try:
+            while True:
+                body = await _read_message(reader)
+                if body[0] != MSG_ACK:
+                    continue
+                tick = _ACK.unpack(body)[1]
+                if tick > session.acked_tick and tick in session.sent:
+                    session.acked_tick = tick
+                    for old in [t for t in session.sent if t < tick]:
+                        del session.sent[old]
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            session.closed = True
+            session.wake.set()
+
+
+class SyncClient:
+    def __init__(self, host: str = '127.0.0.1', port: int = None, path: str = None) -> None:
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.path = path
+        self.canvas_size = None
+        self.latest = None
+        self.bytes_received = 0
+        self._loop = None
+        self._thread = None
+        self._task = None
+
+    async def run(self):
+        if self.path is not None:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        states = {}
+        try:
+            while True:
+                body = await _read_message(reader)
+                self.bytes_received += len(body) + _LENGTH.size
+                if body[0] == MSG_HELLO:
+                    _, version, width, height = _HELLO.unpack(body)
+                    if version != PROTOCOL_VERSION:
+                        raise ValueError(f'unsupported sync protocol version {version}')
+                    self.canvas_size = (width, height)
+                elif body[0] == MSG_DELTA:
+                    tick, base_tick, state = decode_delta(body, states)
+                    states = {t: s for t, s in states.items() if t >= base_tick}
+                    states[tick] = state
+                    self.latest = (tick, state)
+                    writer.write(encode_ack(tick))
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def start_in_thread(self):
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._task = self._loop.create_task(self.run())
+            try:
+                self._loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='sync-client', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+            self._thread.join()
+            self._thread = None
+
+
+class RemoteDisplayFrame(Frame):
+    # thin renderer for a SyncClient; keeps one persistent canvas item per remote sprite
+
+    def __init__(self, master=None, client: SyncClient = None, catalog: ImageCatalog = None,
+                 delay_time: int = 8, canvas_width: int = 800, canvas_height: int = 600,
+                 canvas_bg: str = 'black') -> None:
+        super().__init__(master)
+        self.client = client
+        self.catalog = catalog if catalog is not None else ImageCatalog()
+        self.delay_time = delay_time
+        self.canvas = Canvas(self, width=canvas_width, height=canvas_height, bg=canvas_bg)
+        self.canvas.pack()
+        self._items = {}
+        self._rendered_tick = None
+        self._sized = False
+
+    def poll(self):
+        latest = self.client.latest
+        if not self._sized and self.client.canvas_size is not None:
+            width, height = self.client.canvas_size
+            self.canvas.config(width=width, height=height)
+            self._sized = True
+        if latest is not None and latest[0] != self._rendered_tick:
+            self._rendered_tick = latest[0]
+            self.render(latest[1])
+        self.after(self.delay_time, self.poll)
+
+    def render(self, state: dict):
+        canvas = self.canvas
+        items = self._items
+        for eid in [eid for eid in items if eid not in state]:
+            canvas.delete(items.pop(eid)[0])
+        created = []
+        for eid, record in state.items():
+            current = items.get(eid)
+            if current is None:
+                created.append(eid)
+                continue
+            item, drawn = current
+            if drawn == record:
+                continue
+            x, y, width, height, image_id = record
+            image = self.catalog.image(image_id)
+            if (self.catalog.image(drawn[4]) is None) != (image is None):
+                canvas.delete(item)
+                created.append(eid)
+                continue
+            if image is None:
+                canvas.coords(item, x, y, x + width, y + height)
+            else:
+                if drawn[:2] != record[:2]:
+                    canvas.coords(item, x, y)
+                if drawn[4] != image_id:
+                    canvas.itemconfigure(item, image=image)
+            items[eid] = (item, record)
+        # entity ids grow in first-seen draw order, so creating in id order keeps stacking
+        for eid in sorted(created):
+            record = state[eid]
+            x, y, width, height, image_id = record
+            image = self.catalog.image(image_id)
+            if image is None:
+                item = canvas.create_rectangle(x, y, x + width, y + height, outline='white')
+            else:
+                item = canvas.create_image(x, y, anchor=NW, image=image)
+            items[eid] = (item, record)
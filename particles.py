@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+import random
+from array import array
+
+
+class ParticleEmitter:
+    # particles live in parallel arrays (no per-particle objects); the live ones are
+    # kept packed at the front so update and draw only walk [0, count)
+
+    def __init__(self, images: list, capacity: int = 2048, lifetime: int = 500,
+                 min_speed: float = 0.05, max_speed: float = 0.25, gravity: float = 0.0005) -> None:
+        super().__init__()
+        self.capacity = capacity
+        self.lifetime = lifetime
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self.gravity = gravity
+        self.count = 0
+        self.dropped = 0
+        self._x = array('d', bytes(8 * capacity))
+        self._y = array('d', bytes(8 * capacity))
+        self._vx = array('d', bytes(8 * capacity))
+        self._vy = array('d', bytes(8 * capacity))
+        self._age = array('d', bytes(8 * capacity))
+        self._life = array('d', bytes(8 * capacity))
+        self._frame = array('H', bytes(2 * capacity))
+        self._random = random.Random()  # keeps the game's RNG (and snapshots) untouched
+        self.images = images
+
+    @property
+    def images(self):
+        return self._images
+
+    @images.setter
+    def images(self, value: list):
+        self._images = value
+        self._image_names = [str(image) for image in value]
+
+    def clear(self):
+        self.count = 0
+
+    def burst(self, x: float, y: float, amount: int = 24):
+        rng = self._random
+        free = self.capacity - self.count
+        if amount > free:
+            self.dropped += amount - free
+            amount = free
+        for i in range(self.count, self.count + amount):
+            angle = rng.uniform(0.0, 2 * math.pi)
+            speed = rng.uniform(self.min_speed, self.max_speed)
+            self._x[i] = x
+            self._y[i] = y
+            self._vx[i] = math.cos(angle) * speed
+            self._vy[i] = math.sin(angle) * speed
+            self._age[i] = 0.0
+            self._life[i] = self.lifetime * rng.uniform(0.6, 1.0)
+            self._frame[i] = 0
+        self.count += amount
+
+    def update(self, delta_time: int):
+        xs, ys, vxs, vys = self._x, self._y, self._vx, self._vy
+        ages, lives, frames = self._age, self._life, self._frame
+        frame_count = len(self._images)
+        fall = self.gravity * delta_time
+        n = self.count
+        i = 0
+        while i < n:
+            age = ages[i] + delta_time
+            if age >= lives[i]:
+                # expired: move the last live particle into this slot
+                n -= 1
+                xs[i], ys[i], vxs[i], vys[i] = xs[n], ys[n], vxs[n], vys[n]
+                ages[i], lives[i], frames[i] = ages[n], lives[n], frames[n]
+                continue
+            ages[i] = age
+            vys[i] += fall
+            xs[i] += vxs[i] * delta_time
+            ys[i] += vys[i] * delta_time
+            frames[i] = int(age * frame_count / lives[i])
+            i += 1
+        self.count = n
+
+    def draw(self, canvas):
+        # one Tcl round trip for the whole batch instead of one create_image per particle
+        if not self.count:
+            return
+        path = str(canvas)
+        names = self._image_names
+        scale = getattr(canvas, 'scale', 1.0)
+        ox, oy = getattr(canvas, 'origin_x', 0), getattr(canvas, 'origin_y', 0)
+        if scale != 1.0:
+            names = [str(canvas.image_for(image)) for image in self._images]
+        xs, ys, frames = self._x, self._y, self._frame
+        canvas.tk.eval('\n'.join(
+            '%s create image %d %d -image %s -tags particle' % (path, (xs[i] - ox) * scale, (ys[i] - oy) * scale,
+                                                                names[frames[i]])
+            for i in range(self.count)))
+
+    def render_state(self):
+        # immutable copy of the live particles for drawing on another thread
+        return ParticleSnapshot(self._images, self._image_names, self._x[:self.count], self._y[:self.count],
+                                self._frame[:self.count])
+
+
+class ParticleSnapshot:
+    __slots__ = ('count', '_images', '_image_names', '_x', '_y', '_frame')
+
+    def __init__(self, images: list, image_names: list, xs: array, ys: array, frames: array) -> None:
+        self.count = len(xs)
+        self._images = images
+        self._image_names = image_names
+        self._x = xs
+        self._y = ys
+        self._frame = frames
+
+    draw = ParticleEmitter.draw
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from contextlib import contextmanager
+from tkinter import Canvas
+
+from imagehelper import ImageHelper
+
+
+class ScaledCanvas(Canvas):
+    # game code keeps drawing in logical coordinates; positions, font sizes and images
+    # are mapped to the current scale here. origin_x/origin_y is the logical point drawn
+    # at the top left corner (a scrolling camera), see translated()
+
+    def __init__(self, master=None, logical_width: int = 800, logical_height: int = 600, **kw) -> None:
+        super().__init__(master, **kw)
+        self.logical_width = logical_width
+        self.logical_height = logical_height
+        self.scale = 1.0
+        self.origin_x = 0
+        self.origin_y = 0
+        self.generation = 0
+        self.missing_variants = False
+        self._variants = None
+        self._unscaled = weakref.WeakSet()  # images without a FrameSource, drawn at their own size
+        self._identity = True
+
+    def set_scale(self, scale: float, variants=None):
+        # variants maps base images to images pre-scaled for `scale`
+        self.scale = scale
+        self._variants = variants
+        self._identity = scale == 1.0 and self.origin_x == 0 and self.origin_y == 0
+        self.missing_variants = False
+        self.generation += 1
+        self.config(width=round(self.logical_width * scale), height=round(self.logical_height * scale))
+
+    @contextmanager
+    def translated(self, x: int, y: int):
+        # draws made inside the block are offset so logical (x, y) lands at the top left
+        previous = self.origin_x, self.origin_y
+        self.origin_x, self.origin_y = x, y
+        self._identity = self.scale == 1.0 and x == 0 and y == 0
+        try:
+            yield self
+        finally:
+            self.origin_x, self.origin_y = previous
+            self._identity = self.scale == 1.0 and previous == (0, 0)
+
+    def image_for(self, image):
+        if self._variants is None or image is None:
+            return image
+        variant = self._variants.get(image)
+        if variant is None:
+            # only images ImageHelper can render again get a variant; asking for the others
+            # would request (and apply) an unchanged table on every frame
+            if image not in self._unscaled:
+                if ImageHelper.source_of(image) is None:
+                    self._unscaled.add(image)
+                else:
+                    self.missing_variants = True
+            return image
+        return variant
+
+    def _scaled(self, args):
+        if len(args) == 1 and isinstance(args[0], (tuple, list)):
+            args = args[0]
+        scale, ox, oy = self.scale, self.origin_x, self.origin_y
+        return [(value - (oy if i & 1 else ox)) * scale for i, value in enumerate(args)]
+
+    def create_image(self, *args, **kw):
+        if not self._identity:
+            args = self._scaled(args)
+            if 'image' in kw:
+                kw['image'] = self.image_for(kw['image'])
+        return super().create_image(*args, **kw)
+
+    def create_rectangle(self, *args, **kw):
+        if not self._identity:
+            args = self._scaled(args)
+        return super().create_rectangle(*args, **kw)
+
+    def create_line(self, *args, **kw):
+        if not self._identity:
+            args = self._scaled(args)
+        return super().create_line(*args, **kw)
+
+    def create_oval(self, *args, **kw):
+        if not self._identity:
+            args = self._scaled(args)
+        return super().create_oval(*args, **kw)
+
+    def create_text(self, *args, **kw):
+        if not self._identity:
+            args = self._scaled(args)
+            font = kw.get('font')
+            if self.scale != 1.0 and isinstance(font, tuple) and len(font) > 1:
+                kw['font'] = (font[0], max(1, round(font[1] * self.scale))) + tuple(font[2:])
+        return super().create_text(*args, **kw)
+
+    def coords(self, tagOrId, *args):
+        if self._identity:
+            return super().coords(tagOrId, *args)
+        if args:
+            return super().coords(tagOrId, *self._scaled(args))
+        scale, ox, oy = self.scale, self.origin_x, self.origin_y
+        return [value / scale + (oy if i & 1 else ox) for i, value in enumerate(super().coords(tagOrId))]
+
+    def move(self, tagOrId, xAmount, yAmount):
+        super().move(tagOrId, xAmount * self.scale, yAmount * self.scale)
+
+    def itemconfigure(self, tagOrId, cnf=None, **kw):
+        if self._variants is not None and 'image' in kw:
+            kw['image'] = self.image_for(kw['image'])
+        return super().itemconfigure(tagOrId, cnf, **kw)
+
+    itemconfig = itemconfigure
+
+
+class VariantCache:
+    # per-scale variants of every frame loaded through ImageHelper; PIL resizing runs on
+    # a worker thread and only the PIL->Tk transfer runs on the Tk thread, in small batches
+
+    def __init__(self, widget, batch_size: int = 16, poll_interval: int = 30) -> None:
+        super().__init__()
+        self.widget = widget
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._tables = {}
+        self._pending = None
+
+    def table(self, scale: float):
+        return self._tables.get(scale)
+
+    @property
+    def scales(self):
+        return sorted(self._tables)
+
+    def request(self, scale: float, callback):
+        # callback(scale, table) runs on the Tk thread once every frame has a variant
+        table = self._tables.get(scale)
+        jobs = [(weakref.ref(image), source) for image, source in ImageHelper.sources()
+                if table is None or image not in table]
+        if table is not None and not jobs:
+            callback(scale, table)
+            return
+        pending = self._pending
+        if pending is not None:
+            if pending['scale'] == scale:
+                pending['callback'] = callback
+                return
+            pending['cancelled'] = True
+        job = {'scale': scale, 'callback': callback, 'results': [], 'done': False, 'cancelled': False}
+        self._pending = job
+        worker = threading.Thread(target=self._render, args=(job, jobs), name='variant-cache', daemon=True)
+        worker.start()
+        self.widget.after(self.poll_interval, self._convert, job,
+                          table if table is not None else weakref.WeakKeyDictionary(), 0)
+
+    def _render(self, job: dict, jobs: list):
+        for ref, source in jobs:
+            if job['cancelled']:
+                return
+            try:
+                job['results'].append((ref, source.render(job['scale'])))
+            except OSError:
+                job['results'].append((ref, None))  # e.g. the file is gone: keeps the base image
+        job['done'] = True
+
+    def _convert(self, job: dict, table, index: int):
+        if job is not self._pending:
+            return
+        results = job['results']
+        end = min(len(results), index + self.batch_size)
+        for ref, pil_image in results[index:end]:
+            image = ref()
+            if image is not None:
+                table[image] = image if pil_image is None else ImageHelper.to_photo(pil_image)
+        if job['done'] and end == len(results):
+            self._pending = None
+            self._tables[job['scale']] = table
+            job['callback'](job['scale'], table)
+        else:
+            self.widget.after(self.poll_interval if end == index else 1, self._convert, job, table, end)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from time import perf_counter
+
+from spritelib import Sprite
+
+# Optional simulation thread for an AnimatedGameFrame: a worker runs step() at a fixed rate
+# under frame.sim_lock and publishes an immutable RenderSnapshot after every step; the Tk
+# thread only draws the newest one. A slow draw no longer holds back the simulation.
+
+
+def _sprites(drawable):
+    # what drawable.draw() would draw: active objects only for falling object collections
+    if isinstance(drawable, Sprite):
+        yield drawable
+    elif hasattr(drawable, 'active_objects'):
+        for obj in drawable.active_objects:
+            yield from _sprites(obj)
+    elif hasattr(drawable, 'objects'):
+        for obj in drawable.objects:
+            yield from _sprites(obj)
+    elif hasattr(drawable, 'sprite'):
+        yield drawable.sprite
+
+
+class FrozenSprites:
+    # copies of the fields Sprite.draw reads
+    __slots__ = ('items',)
+
+    def __init__(self, items: tuple) -> None:
+        self.items = items
+
+    @classmethod
+    def of(cls, drawable):
+        return cls(tuple((s.x, s.y, s.width, s.height, s.border_color, s.border_width, s.fill_color, s.image)
+                         for s in _sprites(drawable)))
+
+    def draw(self, canvas):
+        for x, y, width, height, border_color, border_width, fill_color, image in self.items:
+            canvas.create_rectangle(x, y, x + width, y + height, outline=border_color,
+                                    fill=fill_color, width=border_width)
+            canvas.create_image(x, y, anchor='nw', image=image)
+
+
+def freeze(drawable):
+    # drawables with their own render_state() (e.g. ParticleEmitter) copy themselves
+    render_state = getattr(drawable, 'render_state', None)
+    if render_state is not None:
+        return render_state()
+    return FrozenSprites.of(drawable)
+
+
+class RenderSnapshot:
+    __slots__ = ('tick', 'cost', 'layers', 'state')
+
+    def __init__(self, tick: int, cost: float, layers: tuple, state: dict) -> None:
+        self.tick = tick
+        self.cost = cost  # seconds the step took on the simulation thread
+        self.layers = layers  # (source drawable, frozen copy) in draw order
+        self.state = state  # frame values the HUD shows, see AnimatedGameFrame.render_state
+
+
+class SnapshotBuffer:
+    # latest wins: the renderer always gets the newest snapshot, older unrendered ones are dropped
+
+    def __init__(self, depth: int = 3) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._snapshots = deque(maxlen=depth)
+        self._taken = -1
+        self.published = 0
+        self.presented = 0
+
+    def publish(self, snapshot: RenderSnapshot):
+        with self._lock:
+            self._snapshots.append(snapshot)
+            self.published += 1
+
+    def latest(self):
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def take(self):
+        # the newest snapshot if it was not taken yet, else None
+        with self._lock:
+            if not self._snapshots or self._snapshots[-1].tick == self._taken:
+                return None
+            snapshot = self._snapshots[-1]
+            self._taken = snapshot.tick
+            self.presented += 1
+            return snapshot
+
+    @property
+    def dropped(self) -> int:
+        return self.published - self.presented
+
+
+class SimulationThread:
+    def __init__(self, frame, step_ms: int = None, max_catch_up: int = 5, depth: int = 3) -> None:
+        super().__init__()
+        self.frame = frame
+        self.step_ms = step_ms if step_ms is not None else frame.delay_time
+        self.max_catch_up = max_catch_up  # steps run back to back before the schedule is reset
+        self.buffer = SnapshotBuffer(depth)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_alive:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='simulation', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        # the frame was started or resumed
+        self._wake.set()
+
+    def _run(self):
+        frame, step = self.frame, self.step_ms / 1000
+        deadline = None
+        while not self._stopped.is_set():
+            if not frame.is_running:
+                deadline = None
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            with frame.sim_lock:
+                if deadline is None:
+                    # time spent paused or hidden is not simulated
+                    frame.current_time = frame.clock()
+                cost = frame.step()
+                snapshot = frame.capture_render_state(cost)
+            self.buffer.publish(snapshot)
+            now = perf_counter()
+            deadline = now + step if deadline is None else deadline + step
+            if now - deadline > step * self.max_catch_up:
+                deadline = now  # too far behind, drop the backlog instead of spiralling
+            elif deadline > now:
+                self._stopped.wait(deadline - now)
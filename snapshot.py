@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import random
+import struct
+from array import array
+
+from spritelib import Sprite, Direction, AnimatedPlatformer, iter_entities
+
+SNAPSHOT_MAGIC = b'FOGS'
+SNAPSHOT_VERSION = 1
+
+KIND_SPRITE = 1
+KIND_ANIMATED = 2
+KIND_PLATFORMER = 3
+
+# fixed-layout records, little endian
+_HEADER = struct.Struct('<4sHiiBBI')  # magic, version, lives, points, gameover, has rng, entity count
+_RNG = struct.Struct('<Bd?')  # rng version, gauss_next, gauss_next present
+_RNG_WORDS = 625
+_SPRITE = '<Bii'  # kind, x, y
+_MOVER = 'Biii'  # direction, delay time, speed, elapsed time
+_JUMPER = 'd?i'  # vertical speed, is jumping, elapsed time
+_ANIMATION = 'BHii?'  # image list slot, current frame, elapsed time, frame delay, paused
+
+_RECORDS = {
+    KIND_SPRITE: struct.Struct(_SPRITE),
+    KIND_ANIMATED: struct.Struct(_SPRITE + _MOVER + _ANIMATION),
+    KIND_PLATFORMER: struct.Struct(_SPRITE + _MOVER + _JUMPER + _ANIMATION),
+}
+
+_DIRECTIONS = list(Direction)
+_DIRECTION_CODES = {d: i for i, d in enumerate(_DIRECTIONS)}
+_IMAGE_LISTS = ('_left_images', '_right_images', '_up_images', '_down_images')
+_NO_SLOT = 0xFF
+
+
+def _kind_of(entity) -> int:
+    if isinstance(entity, Sprite):
+        return KIND_SPRITE
+    if isinstance(entity, AnimatedPlatformer):
+        return KIND_PLATFORMER
+    if hasattr(entity, 'mover') and hasattr(entity, 'animation'):
+        return KIND_ANIMATED
+    raise TypeError(f'cannot snapshot {type(entity).__name__}')
+
+
+def _image_lists(entity) -> list:
+    return [getattr(entity, name) for name in _IMAGE_LISTS if hasattr(entity, name)]
+
+
+def _image_slot(entity, animation) -> int:
+    for slot, images in enumerate(_image_lists(entity)):
+        if images is animation.images:
+            return slot
+    return _NO_SLOT
+
+
+class GameSnapshot:
+    # versioned binary snapshot of a FallingObjectGameFrame (or any list of spritelib entities)
+
+    @classmethod
+    def entities_of(cls, game) -> list:
+        # effects without a sprite (particles) are transient and not part of the state
+        return [e for e in iter_entities(game.updateables) if isinstance(e, Sprite) or hasattr(e, 'sprite')]
+
+    @classmethod
+    def capture(cls, game, include_rng: bool = True) -> bytes:
+        return cls.capture_entities(cls.entities_of(game), game.lives, game.points,
+                                    game.gameover, include_rng)
+
+    @classmethod
+    def capture_entities(cls, entities: list, lives: int = 0, points: int = 0,
+                         gameover: bool = False, include_rng: bool = True) -> bytes:
+        kinds = [_kind_of(e) for e in entities]
+        size = _HEADER.size + sum(_RECORDS[k].size for k in kinds)
+        if include_rng:
+            size += _RNG.size + _RNG_WORDS * 4
+        buffer = bytearray(size)
+        _HEADER.pack_into(buffer, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, lives, points,
+                          gameover, include_rng, len(entities))
+        offset = _HEADER.size
+        if include_rng:
+            version, words, gauss_next = random.getstate()
+            _RNG.pack_into(buffer, offset, version, gauss_next or 0.0, gauss_next is not None)
+            offset += _RNG.size
+            buffer[offset:offset + _RNG_WORDS * 4] = array('I', words).tobytes()
+            offset += _RNG_WORDS * 4
+        for entity, kind in zip(entities, kinds):
+            record = _RECORDS[kind]
+            record.pack_into(buffer, offset, *cls._fields(entity, kind))
+            offset += record.size
+        return bytes(buffer)
+
+    @classmethod
+    def _fields(cls, entity, kind: int) -> tuple:
+        if kind == KIND_SPRITE:
+            return kind, int(entity.x), int(entity.y)
+        sprite, mover, animation = entity.sprite, entity.mover, entity.animation
+        fields = (kind, int(sprite.x), int(sprite.y),
+                  _DIRECTION_CODES[mover.direction], int(mover.delay_time), int(mover.speed),
+                  int(mover.elapsed_time))
+        if kind == KIND_PLATFORMER:
+            jumper = entity.jumper
+            fields += (float(jumper.vertical_speed), jumper.is_jumping, int(jumper.elapsed_time))
+        return fields + (_image_slot(entity, animation), animation.current_frame,
+                         int(animation.elapsed_time), int(animation.frame_delay), animation.paused)
+
+    @classmethod
+    def restore(cls, game, data: bytes):
+        lives, points, gameover = cls.restore_entities(cls.entities_of(game), data)
+        game.lives = lives
+        game.points = points
+        game.gameover = gameover
+
+    @classmethod
+    def restore_entities(cls, entities: list, data: bytes) -> tuple:
+        # every record is parsed and checked before anything is applied, a bad snapshot
+        # leaves the game and the random generator untouched
+        if len(data) < _HEADER.size:
+            raise ValueError('snapshot is truncated')
+        magic, version, lives, points, gameover, has_rng, count = _HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError('not a game snapshot')
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f'unsupported snapshot version {version}')
+        if count != len(entities):
+            raise ValueError(f'snapshot has {count} entities, game has {len(entities)}')
+        kinds = [_kind_of(e) for e in entities]
+        size = _HEADER.size + sum(_RECORDS[k].size for k in kinds)
+        if has_rng:
+            size += _RNG.size + _RNG_WORDS * 4
+        if len(data) != size:
+            raise ValueError(f'snapshot is {len(data)} bytes, expected {size}')
+        offset = _HEADER.size
+        rng_state = None
+        if has_rng:
+            rng_version, gauss_next, has_gauss = _RNG.unpack_from(data, offset)
+            offset += _RNG.size
+            words = array('I')
+            words.frombytes(data[offset:offset + _RNG_WORDS * 4])
+            offset += _RNG_WORDS * 4
+            rng_state = (rng_version, tuple(words), gauss_next if has_gauss else None)
+        records = []
+        for entity, kind in zip(entities, kinds):
+            if data[offset] != kind:
+                raise ValueError(f'snapshot record kind {data[offset]} does not match {type(entity).__name__}')
+            record = _RECORDS[kind]
+            fields = record.unpack_from(data, offset)
+            if kind != KIND_SPRITE and fields[3] >= len(_DIRECTIONS):
+                raise ValueError(f'snapshot direction {fields[3]} is not valid')
+            records.append(fields)
+            offset += record.size
+        if rng_state is not None:
+            random.setstate(rng_state)
+        for entity, kind, fields in zip(entities, kinds, records):
+            cls._apply(entity, kind, fields)
+        return lives, points, bool(gameover)
+
+    @classmethod
+    def _apply(cls, entity, kind: int, fields: tuple):
+        if kind == KIND_SPRITE:
+            entity.x, entity.y = fields[1], fields[2]
+            return
+        sprite, mover, animation = entity.sprite, entity.mover, entity.animation
+        sprite.x, sprite.y = fields[1], fields[2]
+        mover.direction = _DIRECTIONS[fields[3]]
+        mover.delay_time, mover.speed, mover.elapsed_time = fields[4], fields[5], fields[6]
+        if kind == KIND_PLATFORMER:
+            jumper = entity.jumper
+            jumper.vertical_speed, jumper.is_jumping, jumper.elapsed_time = fields[7], fields[8], fields[9]
+        slot, frame, elapsed, frame_delay, paused = fields[-5:]
+        lists = _image_lists(entity)
+        if slot != _NO_SLOT and slot < len(lists):
+            animation.images = lists[slot]
+        animation.current_frame = min(frame, len(animation.images) - 1)
+        animation.elapsed_time = elapsed
+        animation.frame_delay = frame_delay
+        animation.paused = paused
+        sprite.image = animation.current_image
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+from time import perf_counter
+from tkinter import TclError
+
+# Long-run soak test of the game screen: ticks it on a virtual clock as fast as possible with
+# scripted input and checks memory, canvas items, threads, Tk images and frame time drift.
+# Needs a display; on a headless box run it under a virtual one:
+#   xvfb-run -a python soak.py --ticks 2000000
+
+
+def rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1048576
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, in KiB on Linux
+
+
+class VirtualClock:
+    def __init__(self, start: int = 0) -> None:
+        super().__init__()
+        self.now = start
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance(self, ms: int):
+        self.now += ms
+
+
+class SoakRun:
+    # scripted player: changes direction every few hundred ticks, tweaks the speed now and then
+    # and restarts after game over, so load_assets/reset paths are exercised too
+
+    def __init__(self, root, args) -> None:
+        super().__init__()
+        self.root = root
+        self.args = args
+        self.game = root.get_frame('playgame')
+        self.clock = VirtualClock(self.game.clock())
+        self.rng = random.Random(args.seed)
+        self.failures = []
+        self.baseline = None
+        self.resets = 0
+        self._window_cost = 0.0
+        self._window_ticks = 0
+        self._log = open(args.log, 'a', encoding='utf-8') if args.log else None
+
+    def press(self, keysym: str):
+        # through the real bindings, as a keyboard would
+        self.root.event_generate(f'<KeyPress-{keysym}>', when='tail')
+
+    def script(self, tick: int):
+        if self.game.gameover:
+            # what 'y' does, called directly so it runs exactly once
+            self.game.reset_game()
+            self.root.show_frame('playgame')
+            self.press(self.rng.choice(('Left', 'Right')))
+            self.resets += 1
+        elif tick % self.args.input_every == 0:
+            self.press(self.rng.choice(('Left', 'Right')))
+            if self.rng.random() < 0.1:
+                self.press(self.rng.choice(('s', 'a')))
+
+    def sample(self) -> dict:
+        gc.collect()
+        return {
+            'rss_mb': round(rss_mb(), 1),
+            'canvas_items': len(self.game.canvas.find_all()),
+            'threads': threading.active_count(),
+            'tk_images': len(self.root.image_names()),
+            'gc_objects': len(gc.get_objects()),
+            'tick_ms': round(self._window_cost * 1000 / max(1, self._window_ticks), 4),
+        }
+
+    def check(self, tick: int, stats: dict):
+        args, base = self.args, self.baseline
+        checks = [
+            ('rss growth', stats['rss_mb'] - base['rss_mb'] > args.max_rss_growth),
+            ('canvas items', stats['canvas_items'] > args.max_canvas_items),
+            ('threads', stats['threads'] - base['threads'] > args.max_thread_growth),
+            ('tk images', stats['tk_images'] - base['tk_images'] > args.max_image_growth),
+            ('frame time drift', base['tick_ms'] > 0 and stats['tick_ms'] / base['tick_ms'] > args.max_drift),
+        ]
+        for name, failed in checks:
+            if failed:
+                self.failures.append((tick, name, stats))
+
+    def report(self, tick: int, stats: dict):
+        line = dict(tick=tick, resets=self.resets, **stats)
+        print(' '.join(f'{key}={value}' for key, value in line.items()), flush=True)
+        if self._log is not None:
+            self._log.write(json.dumps(line) + '\n')
+            self._log.flush()
+
+    def run(self) -> int:
+        args, game, root = self.args, self.game, self.root
+        game.clock = self.clock
+        game.suspend('soak')  # the harness ticks the frame itself, its own after() loop stays off
+        root.show_frame('playgame')
+        root.update()
+        self.press('Right')
+        for tick in range(1, args.ticks + 1):
+            self.clock.advance(args.step)
+            self.script(tick)
+            if not game.is_paused:
+                began = perf_counter()
+                game.tick()
+                self._window_cost += perf_counter() - began
+                self._window_ticks += 1
+            if tick % args.pump_every == 0:
+                root.update()  # key events, idle redraws and Tk's own deferred frees
+            if tick % args.report_every == 0:
+                stats = self.sample()
+                if self.baseline is None and tick >= args.warmup:
+                    self.baseline = stats
+                elif self.baseline is not None:
+                    self.check(tick, stats)
+                self.report(tick, stats)
+                self._window_cost = 0.0
+                self._window_ticks = 0
+                if self.failures and args.fail_fast:
+                    break
+        if self._log is not None:
+            self._log.close()
+        for tick, name, stats in self.failures:
+            print(f'FAIL at tick {tick}: {name} {stats}', file=sys.stderr)
+        return 1 if self.failures else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='soak test the falling object game')
+    parser.add_argument('--ticks', type=int, default=1_000_000)
+    parser.add_argument('--step', type=int, default=8, help='virtual ms per tick')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--input-every', type=int, default=250, help='ticks between scripted key presses')
+    parser.add_argument('--pump-every', type=int, default=10, help='ticks between Tk event processing')
+    parser.add_argument('--report-every', type=int, default=20_000)
+    parser.add_argument('--warmup', type=int, default=20_000, help='ticks before the baseline sample')
+    parser.add_argument('--max-rss-growth', type=float, default=64.0, help='MB over baseline')
+    parser.add_argument('--max-canvas-items', type=int, default=500)
+    parser.add_argument('--max-thread-growth', type=int, default=2)
+    parser.add_argument('--max-image-growth', type=int, default=64)
+    parser.add_argument('--max-drift', type=float, default=1.5, help='tick time ratio over baseline')
+    parser.add_argument('--fail-fast', action='store_true')
+    parser.add_argument('--log', help='append JSONL samples to this file')
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+    from game_gui_lib import MyApp
+    try:
+        root = MyApp()
+    except TclError as e:
+        print(f'soak needs a display ({e}); try: xvfb-run -a python soak.py', file=sys.stderr)
+        return 2
+    try:
+        return SoakRun(root, args).run()
+    finally:
+        root.destroy()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import bisect
+import functools
 import random
+import weakref
 from tkinter import *
 from enum import Enum
 
@@ -68,6 +71,63 @@ class Clamp:
 		cls.clamp_y(sprite, top_limit, bottom_limit)
 
 
+# PhotoImage -> CollisionMask, filled by ImageHelper when frames are loaded
+_masks = weakref.WeakKeyDictionary()
+# PhotoImage -> (width, height), filled by ImageHelper when frames are made. Sprites read sizes
+# from here: PhotoImage.width() is a Tcl call, which a simulation thread must never make
+_sizes = weakref.WeakKeyDictionary()
+
+
+def register_image_size(image, width: int, height: int):
+	_sizes[image] = (width, height)
+
+
+def image_size(image) -> tuple:
+	# only the first lookup of an image made outside ImageHelper asks Tk
+	size = _sizes.get(image)
+	if size is None:
+		size = _sizes[image] = (image.width(), image.height())
+	return size
+
+
+class CollisionMask:
+	# opaque pixels of a frame, one int per row with bit x set when column x is opaque
+	
+	def __init__(self, width: int, height: int, rows: tuple) -> None:
+		super().__init__()
+		self.width = width
+		self.height = height
+		self.rows = rows
+	
+	@classmethod
+	def of(cls, image):
+		return None if image is None else _masks.get(image)
+	
+	@classmethod
+	def register(cls, image, mask: CollisionMask):
+		_masks[image] = mask
+	
+	@classmethod
+	@functools.lru_cache(maxsize=64)
+	def solid(cls, width: int, height: int):
+		# stands in for sprites without an image or without a mask
+		return cls(width, height, ((1 << width) - 1,) * height)
+	
+	def overlaps(self, other: CollisionMask, dx: int, dy: int) -> bool:
+		# other placed at (dx, dy) relative to this mask
+		rows, other_rows = self.rows, other.rows
+		top, bottom = max(0, dy), min(self.height, dy + other.height)
+		if dx >= 0:
+			for y in range(top, bottom):
+				if rows[y] & (other_rows[y - dy] << dx):
+					return True
+		else:
+			for y in range(top, bottom):
+				if rows[y] & (other_rows[y - dy] >> -dx):
+					return True
+		return False
+
+
 class Direction(Enum):
 	LEFT = "Left"
 	UP = "Up"
@@ -80,10 +140,11 @@ class Sprite:
 	def __init__(self, x: int = 0, y: int = 0, width: int = 25,
 				 height: int = 25,
 				 border_color: str = 'black', border_width: int = 2,
-				 fill_color: str = '', image: PhotoImage = None) -> None:
+				 fill_color: str = '', image: PhotoImage = None, z: int = 0) -> None:
 		super().__init__()
 		self.x = x
 		self.y = y
+		self.z = z  # draw order in RenderLayers, higher is on top
 		self._width = width
 		self._height = height
 		self.border_color = border_color
@@ -91,8 +152,7 @@ class Sprite:
 		self.fill_color = fill_color
 		self._image = image
 		if self._image is not None:
-			self._width = self._image.width()
-			self._height = self._image.height()
+			self._width, self._height = image_size(self._image)
 	
 	@property
 	def center_x(self):
@@ -146,8 +206,7 @@ class Sprite:
 	@image.setter
 	def image(self, value):
 		self._image = value
-		self._width = self._image.width()
-		self._height = self._image.height()
+		self._width, self._height = image_size(value)
 	
 	@property
 	def left(self):
@@ -206,6 +265,21 @@ class Sprite:
 		return not (a.right < b.left or a.left > b.right
 					or a.bottom < b.top or a.top > b.bottom)
 	
+	def overlaps(self, other: Sprite) -> bool:
+		# box test first; the masks of the current frames are compared only when boxes overlap
+		if (self.x >= other.x + other._width or other.x >= self.x + self._width
+				or self.y >= other.y + other._height or other.y >= self.y + self._height):
+			return False
+		mask = CollisionMask.of(self._image)
+		other_mask = CollisionMask.of(other._image)
+		if mask is None and other_mask is None:
+			return True
+		if mask is None:
+			mask = CollisionMask.solid(self._width, self._height)
+		if other_mask is None:
+			other_mask = CollisionMask.solid(other._width, other._height)
+		return mask.overlaps(other_mask, other.x - self.x, other.y - self.y)
+	
 	def contains(self, x: int, y: int):
 		return (x in range(self.left, self.right)) \
 			   and (y in range(self.top, self.bottom))
@@ -214,6 +288,96 @@ class Sprite:
 		return str(self.__dict__).replace('_', '')
 
 
+def _timer_advance(elapsed, delay, calls: int, delta, strict: bool = False) -> tuple:
+	# closed form of `calls` times: elapsed += delta; if elapsed >= delay (> when strict): reset and fire.
+	# Returns (times fired, elapsed afterwards)
+	if calls <= 0:
+		return 0, elapsed
+	
+	def wait(start):
+		# calls until the first fire from start, None when it never fires
+		if (start + delta > delay) if strict else (start + delta >= delay):
+			return 1
+		if delta <= 0:
+			return None
+		if strict:
+			return int((delay - start) // delta) + 1
+		return int(-((start - delay) // delta))
+	
+	first = wait(elapsed)
+	if first is None or first > calls:
+		return 0, elapsed + calls * delta
+	period = wait(0)
+	if period is None:
+		return 1, (calls - first) * delta
+	fired = 1 + (calls - first) // period
+	return fired, (calls - first - (fired - 1) * period) * delta
+
+
+def _timer_advance_ms(elapsed, delay, ms: int, tick: int, repeat: int = 1, strict: bool = False) -> tuple:
+	# as _timer_advance for ms // tick ticks of delta tick and one tick of the remainder,
+	# each tick making `repeat` calls
+	if tick <= 0:
+		raise ValueError('tick must be positive')
+	ticks, rest = divmod(ms, tick)
+	fired, elapsed = _timer_advance(elapsed, delay, ticks * repeat, tick, strict)
+	if rest:
+		more, elapsed = _timer_advance(elapsed, delay, repeat, rest, strict)
+		fired += more
+	return fired, elapsed
+
+
+def _bounce(pos: int, forward: bool, lo: int, hi: int, step: int, moves: int) -> tuple:
+	# moves of step that stop at lo/hi and turn around; forward is towards hi
+	if moves <= 0 or step <= 0:
+		return pos, forward
+	span = max(1, (hi - lo) // step + 1)  # moves from one limit until turning at the other
+	first = max(1, ((hi - pos) if forward else (pos - lo)) // step + 1)
+	if moves < first:
+		return (pos + moves * step if forward else pos - moves * step), forward
+	moves = (moves - first) % (2 * span)
+	if forward:
+		return (hi - moves * step, False) if moves < span else (lo + (moves - span) * step, True)
+	return (lo + moves * step, True) if moves < span else (hi - (moves - span) * step, False)
+
+
+def _wrap(pos: int, forward: bool, lo: int, hi: int, step: int, moves: int) -> int:
+	# moves of step that jump back to lo past hi (forward) or to hi past lo
+	if moves <= 0 or step <= 0:
+		return pos
+	span = max(1, (hi - lo) // step + 1)
+	first = max(1, ((hi - pos) if forward else (pos - lo)) // step + 1)
+	if moves < first:
+		return pos + moves * step if forward else pos - moves * step
+	moves = (moves - first) % span
+	return lo + moves * step if forward else hi - moves * step
+
+
+def _advance_by_updates(entity, ms: int, tick: int):
+	ticks, rest = divmod(ms, tick)
+	for _ in range(ticks):
+		entity.update(tick)
+	if rest:
+		entity.update(rest)
+
+
+def _advance_axis(mover: Mover, pos: int, forward: bool, lo: int, hi: int, ms: int, tick: int,
+				  wrap: bool) -> tuple:
+	# position and direction of a bouncer (repeater when wrap) after ms of update(tick) calls;
+	# lo/hi are the valid positions, forward is towards hi
+	if (mover.speed == 0 or not mover.fires_within(tick if ms >= tick else ms)) and \
+			(pos > hi if forward else pos < lo):
+		# the first update does not move but its limit check still applies
+		if wrap:
+			pos = lo if forward else hi
+		else:
+			pos, forward = (hi, False) if forward else (lo, True)
+	moves = mover.count_moves(ms, tick)
+	if wrap:
+		return _wrap(pos, forward, lo, hi, mover.speed, moves), forward
+	return _bounce(pos, forward, lo, hi, mover.speed, moves)
+
+
 class Mover:
 	def __init__(self, sprite: Sprite,
 				 direction: Direction = Direction.RIGHT,
@@ -237,6 +401,30 @@ class Mover:
 			elif self._direction == Direction.DOWN:
 				self._sprite.increment_y(self._speed)
 	
+	def fires_within(self, delta_time: int) -> bool:
+		# whether update(delta_time) would move
+		return self._elapsed_time + delta_time >= self._delay_time
+	
+	def count_moves(self, ms: int, tick: int = 1) -> int:
+		# moves made by update(tick) ms // tick times and update(ms % tick) once; only the
+		# elapsed time is updated, the caller applies the moves
+		moves, self._elapsed_time = _timer_advance_ms(self._elapsed_time, self._delay_time, ms, tick)
+		return moves
+	
+	def advance(self, ms: int, tick: int = 1) -> int:
+		# same result as those update calls, in O(1); returns the number of moves
+		moves = self.count_moves(ms, tick)
+		distance = moves * self._speed
+		if self._direction == Direction.LEFT:
+			self._sprite.increment_x(-distance)
+		elif self._direction == Direction.RIGHT:
+			self._sprite.increment_x(distance)
+		elif self._direction == Direction.UP:
+			self._sprite.increment_y(-distance)
+		elif self._direction == Direction.DOWN:
+			self._sprite.increment_y(distance)
+		return moves
+	
 	@property
 	def sprite(self):
 		return self._sprite
@@ -265,6 +453,14 @@ class Mover:
 	def speed(self, value: int):
 		self._speed = abs(value)
 	
+	@property
+	def elapsed_time(self):
+		return self._elapsed_time
+	
+	@elapsed_time.setter
+	def elapsed_time(self, value: int):
+		self._elapsed_time = value
+	
 	def backup(self):
 		if self._direction == Direction.LEFT:
 			self._sprite.increment_x(self._speed)
@@ -276,6 +472,115 @@ class Mover:
 			self._sprite.increment_y(-self._speed)
 
 
+class PlatformIndex:
+	# static uniform grid over platform bounding boxes, built once per level. Code that moves,
+	# resizes or replaces platforms calls platforms_moved() (or rebuild() on one index)
+	
+	_moves = 0  # bumped by platforms_moved(), indexes built before it rebuild on their next refresh()
+	
+	def __init__(self, platforms: list = None, cell_size: int = 64) -> None:
+		super().__init__()
+		self._cell_size = cell_size
+		self._platforms = []
+		self._built_at = 0
+		self._boxes = []
+		self._cells = {}
+		self.build(platforms if platforms is not None else [])
+	
+	@property
+	def platforms(self):
+		return self._platforms
+	
+	@property
+	def cell_size(self):
+		return self._cell_size
+	
+	def __len__(self):
+		return len(self._platforms)
+	
+	def build(self, platforms: list):
+		size = self._cell_size
+		self._platforms = list(platforms)
+		self._built_at = PlatformIndex._moves
+		self._boxes = [p.bbox() for p in self._platforms]
+		self._cells = {}
+		for i, (left, top, right, bottom) in enumerate(self._boxes):
+			for cx in range(int(left // size), int(right // size) + 1):
+				for cy in range(int(top // size), int(bottom // size) + 1):
+					self._cells.setdefault((cx, cy), []).append(i)
+	
+	def rebuild(self):
+		# after platforms in this index were moved or resized
+		self.build(self._platforms)
+	
+	@classmethod
+	def platforms_moved(cls):
+		# every index rebuilds once, lazily, on its next refresh()
+		cls._moves += 1
+	
+	def refresh(self, platforms: list = None):
+		# O(1) check, called before queries: rebuilds after platforms_moved() or, given the list
+		# the index was made from, when platforms were added or removed
+		if self._built_at != PlatformIndex._moves or (platforms is not None and len(platforms) != len(self._platforms)):
+			self.build(self._platforms if platforms is None else platforms)
+	
+	def _candidates(self, left, top, right, bottom):
+		size = self._cell_size
+		cells = self._cells
+		found = set()
+		for cx in range(int(left // size), int(right // size) + 1):
+			for cy in range(int(top // size), int(bottom // size) + 1):
+				bucket = cells.get((cx, cy))
+				if bucket is not None:
+					found.update(bucket)
+		return found
+	
+	def query(self, box):
+		# first platform (in level order) touching box, same rule as Sprite.intersects
+		left, top, right, bottom = box
+		boxes = self._boxes
+		best = None
+		for i in self._candidates(left, top, right, bottom):
+			b = boxes[i]
+			if not (right < b[0] or left > b[2] or bottom < b[1] or top > b[3]):
+				if best is None or i < best:
+					best = i
+		return None if best is None else self._platforms[best]
+	
+	def query_all(self, box) -> list:
+		left, top, right, bottom = box
+		boxes = self._boxes
+		hits = []
+		for i in self._candidates(left, top, right, bottom):
+			b = boxes[i]
+			if not (right < b[0] or left > b[2] or bottom < b[1] or top > b[3]):
+				hits.append(i)
+		hits.sort()
+		return [self._platforms[i] for i in hits]
+	
+	def sweep(self, box, dy: int):
+		# first platform whose near edge is crossed when box moves vertically by dy
+		left, top, right, bottom = box
+		boxes = self._boxes
+		best = None
+		best_edge = None
+		if dy > 0:
+			for i in self._candidates(left, bottom, right, bottom + dy):
+				b = boxes[i]
+				if right < b[0] or left > b[2] or not bottom <= b[1] <= bottom + dy:
+					continue
+				if best is None or b[1] < best_edge or (b[1] == best_edge and i < best):
+					best, best_edge = i, b[1]
+		elif dy < 0:
+			for i in self._candidates(left, top + dy, right, top):
+				b = boxes[i]
+				if right < b[0] or left > b[2] or not top + dy <= b[3] <= top:
+					continue
+				if best is None or b[3] > best_edge or (b[3] == best_edge and i < best):
+					best, best_edge = i, b[3]
+		return None if best is None else self._platforms[best]
+
+
 class Jumper:
 	
 	def __init__(self, sprite: Sprite, jump_ability: int = -5,
@@ -290,15 +595,36 @@ class Jumper:
 		self._gravity = gravity
 		self._is_jumping = True
 		self._elapsed_time = 0
-		self._platforms = platforms
+		self._platforms = None
+		self._platform_index = None
+		self.platforms = platforms
 	
 	@property
 	def platforms(self):
+		if self._platforms is None and self._platform_index is not None:
+			return self._platform_index.platforms
 		return self._platforms
 	
 	@platforms.setter
 	def platforms(self, value: list):
-		self._platforms = value
+		# accepts a platform list or a prebuilt PlatformIndex shared between jumpers;
+		# a shared index is rebuilt by its owner, not from a copy of its list
+		if isinstance(value, PlatformIndex):
+			self._platform_index = value
+			self._platforms = None
+		else:
+			self._platforms = value
+			self._platform_index = None if value is None else PlatformIndex(value)
+	
+	@property
+	def shares_index(self) -> bool:
+		return self._platforms is None and self._platform_index is not None
+	
+	@property
+	def platform_index(self):
+		if self._platform_index is not None:
+			self._platform_index.refresh(self._platforms)
+		return self._platform_index
 	
 	@property
 	def jump_ability(self):
@@ -340,6 +666,14 @@ class Jumper:
 	def vertical_speed(self, speed: int):
 		self._vertical_speed = speed
 	
+	@property
+	def elapsed_time(self):
+		return self._elapsed_time
+	
+	@elapsed_time.setter
+	def elapsed_time(self, value: int):
+		self._elapsed_time = value
+	
 	def jump(self, force: int = None):
 		if not self._is_jumping:
 			self._is_jumping = True
@@ -353,10 +687,16 @@ class Jumper:
 		return self._sprite
 	
 	def get_intersects_with(self):
-		for p in self._platforms:
-			if self._sprite.intersects(p.bbox()):
-				return p
-		return None
+		index = self.platform_index
+		if index is None:
+			return None
+		return index.query(self._sprite.bbox())
+	
+	def get_crossed_platform(self, dy: int):
+		index = self.platform_index
+		if index is None:
+			return None
+		return index.sweep(self._sprite.bbox(), dy)
 	
 	def update(self, delta_time: int):
 		if self.get_intersects_with() is None:
@@ -367,8 +707,11 @@ class Jumper:
 				self._elapsed_time = 0
 				intersects = False
 				self._vertical_speed += self._gravity
-				self._sprite.increment_y(int(self._vertical_speed))
-				platform = self.get_intersects_with()
+				step = int(self._vertical_speed)
+				platform = self.get_crossed_platform(step)  # catches platforms skipped over at high gravity
+				self._sprite.increment_y(step)
+				if platform is None:
+					platform = self.get_intersects_with()
 				if platform is not None:
 					if self._vertical_speed < 0:
 						self._vertical_speed = -self._vertical_speed  # doesn't allow jumper to pass through platform
@@ -407,6 +750,22 @@ class Animation:
 					self._current_frame = 0
 			self._sprite.image = self._images[self._current_frame]
 	
+	def advance(self, ms: int, tick: int = 1, repeat: int = 1):
+		# same as update(tick) ms // tick times and update(ms % tick) once (each `repeat` times), in O(1)
+		if ms <= 0:
+			return
+		if self._paused:
+			self._elapsed_time = 0
+			return
+		frames, self._elapsed_time = _timer_advance_ms(self._elapsed_time, self._frame_delay, ms, tick,
+													   repeat, strict=True)
+		if frames:
+			frame = self._current_frame + 1
+			if frame >= len(self._images):
+				frame = 0
+			self._current_frame = (frame + frames - 1) % len(self._images)
+		self._sprite.image = self._images[self._current_frame]
+	
 	@property
 	def paused(self):
 		return self._paused
@@ -427,6 +786,18 @@ class Animation:
 	def current_frame(self):
 		return self._current_frame
 	
+	@current_frame.setter
+	def current_frame(self, value: int):
+		self._current_frame = value
+	
+	@property
+	def elapsed_time(self):
+		return self._elapsed_time
+	
+	@elapsed_time.setter
+	def elapsed_time(self, value: int):
+		self._elapsed_time = value
+	
 	@property
 	def images(self):
 		return self._images
@@ -480,7 +851,7 @@ class AnimatedMovingSprite:
 	def update(self, delta_time):
 		self._mover.update(delta_time)
 		self._animation.update(delta_time)
-		self.clamp.clamp_all(self._sprite)
+		self.clamp.clampall(self._sprite)
 
 
 class AnimatedHorizontalMovingSprite:
@@ -608,7 +979,7 @@ class Animated4WayMovingSprite:
 	
 	@property
 	def animation(self):
-		return
+		return self._animation
 	
 	@property
 	def left_images(self):
@@ -709,6 +1080,27 @@ class AnimatedHorizontalBouncer:
 	def draw(self, canvas):
 		self._sprite.draw(canvas)
 	
+	def advance(self, ms: int, tick: int = 1):
+		# same as update(tick) ms // tick times and update(ms % tick) once, in O(1)
+		if ms <= 0:
+			return
+		d = self._mover.direction
+		if d == Direction.LEFT or d == Direction.RIGHT:
+			sprite = self._sprite
+			if self._right_limit - sprite.width < self._left_limit or \
+					len(self._left_images) != len(self._right_images):
+				# narrower than the sprite: it turns on every update; lists of different lengths:
+				# the frame wraps at the length of the list in use at each update. No shortcut
+				return _advance_by_updates(self, ms, tick)
+			x, forward = _advance_axis(self._mover, sprite.x, d == Direction.RIGHT, self._left_limit,
+									   self._right_limit - sprite.width, ms, tick, wrap=False)
+			sprite.x = x
+			self._mover.direction = Direction.RIGHT if forward else Direction.LEFT
+			self._animation.images = self._right_images if forward else self._left_images
+		else:
+			self._mover.advance(ms, tick)
+		self._animation.advance(ms, tick)
+	
 	def update(self, delta_time):
 		self._mover.update(delta_time)
 		if self._mover.direction == Direction.LEFT and \
@@ -781,6 +1173,20 @@ class AnimatedHorizontalRepeater:
 	def draw(self, canvas):
 		self._sprite.draw(canvas)
 	
+	def advance(self, ms: int, tick: int = 1):
+		# same as update(tick) ms // tick times and update(ms % tick) once, in O(1)
+		if ms <= 0:
+			return
+		d = self._mover.direction
+		if d == Direction.LEFT or d == Direction.RIGHT:
+			sprite = self._sprite
+			sprite.x, _ = _advance_axis(self._mover, sprite.x, d == Direction.RIGHT,
+										self._left_limit - sprite.width, self._right_limit, ms, tick, wrap=True)
+			self._animation.images = self._right_images if d == Direction.RIGHT else self._left_images
+		else:
+			self._mover.advance(ms, tick)
+		self._animation.advance(ms, tick)
+	
 	def update(self, delta_time):
 		self._mover.update(delta_time)
 		if self._mover.direction == Direction.LEFT:
@@ -850,6 +1256,27 @@ class AnimatedVerticalBouncer:
 	def draw(self, canvas):
 		self._sprite.draw(canvas)
 	
+	def advance(self, ms: int, tick: int = 1):
+		# same as update(tick) ms // tick times and update(ms % tick) once, in O(1)
+		if ms <= 0:
+			return
+		d = self._mover.direction
+		if d == Direction.UP or d == Direction.DOWN:
+			sprite = self._sprite
+			if self._bottom_limit - sprite.height < self._top_limit or \
+					len(self._up_images) != len(self._down_images):
+				# narrower than the sprite: it turns on every update; lists of different lengths:
+				# the frame wraps at the length of the list in use at each update. No shortcut
+				return _advance_by_updates(self, ms, tick)
+			y, forward = _advance_axis(self._mover, sprite.y, d == Direction.DOWN, self._top_limit,
+									   self._bottom_limit - sprite.height, ms, tick, wrap=False)
+			sprite.y = y
+			self._mover.direction = Direction.DOWN if forward else Direction.UP
+			self._animation.images = self._down_images if forward else self._up_images
+		else:
+			self._mover.advance(ms, tick)
+		self._animation.advance(ms, tick, repeat=2)  # update() steps the animation twice
+	
 	def update(self, delta_time):
 		self._mover.update(delta_time)
 		if self._mover.direction == Direction.UP and \
@@ -923,6 +1350,20 @@ class AnimatedVerticalRepeater:
 	def draw(self, canvas):
 		self._sprite.draw(canvas)
 	
+	def advance(self, ms: int, tick: int = 1):
+		# same as update(tick) ms // tick times and update(ms % tick) once, in O(1)
+		if ms <= 0:
+			return
+		d = self._mover.direction
+		if d == Direction.UP or d == Direction.DOWN:
+			sprite = self._sprite
+			sprite.y, _ = _advance_axis(self._mover, sprite.y, d == Direction.DOWN,
+										self._top_limit - sprite.height, self._bottom_limit, ms, tick, wrap=True)
+			self._animation.images = self._down_images if d == Direction.DOWN else self._up_images
+		else:
+			self._mover.advance(ms, tick)
+		self._animation.advance(ms, tick)
+	
 	def update(self, delta_time):
 		self._mover.update(delta_time)
 		
@@ -1015,7 +1456,7 @@ class AnimatedPlatformer:  # animated clamped moving jumping sprite
 			elif d == Direction.RIGHT:
 				self._animation.images = self._right_images
 		self._jumper.update(delta_time)
-		self._clamper.clamp_all(self._sprite)
+		self._clamper.clampall(self._sprite)
 		if self._sprite.bottom == self._clamper.bottom_limit:
 			self._jumper.is_jumping = False
 			self._jumper.vertical_speed = 0
@@ -1034,7 +1475,7 @@ class AnimatedRandomFallingObject:
 				 ) -> None:
 		super().__init__()
 		self._down_images = downImages
-		x = random.randint(0, right_limit - downImages[0].width())
+		x = random.randint(0, right_limit - image_size(downImages[0])[0])
 		y = random.randint(top_limit, 0)
 		speed = random.randint(min_speed, max_speed)
 		delay_time = random.randint(min_delay_time, max_delay_time)
@@ -1170,6 +1611,7 @@ class AnimatedRandomFallingObjects:
 				 top_limit: int = -600, bottom_limit: int = 600) -> None:
 		super().__init__()
 		self.number_objects = number_objects
+		self._active_count = None
 		self.objects = []
 		for i in range(0, number_objects):
 			obj = AnimatedRandomFallingObject(downImages, border_color,
@@ -1196,6 +1638,27 @@ class AnimatedRandomFallingObjects:
 	@objects.setter
 	def objects(self, value):
 		self._objects = value
+		self._active_count = None
+	
+	@property
+	def active_count(self):
+		if self._active_count is None:
+			return len(self._objects)
+		return self._active_count
+	
+	@active_count.setter
+	def active_count(self, value: int):
+		# inactive objects are neither updated nor drawn; reactivated ones start from the top
+		value = max(0, min(value, len(self._objects)))
+		for obj in self._objects[self.active_count:value]:
+			obj.reset_position()
+		self._active_count = None if value == len(self._objects) else value
+	
+	@property
+	def active_objects(self):
+		if self._active_count is None:
+			return self._objects
+		return self._objects[:self._active_count]
 	
 	def get_falling_object(self, index: int):
 		if index < 0 or index >= len(self._objects):
@@ -1203,16 +1666,267 @@ class AnimatedRandomFallingObjects:
 		return self._objects[index]
 	
 	def draw(self, canvas):
-		for obj in self._objects:
+		for obj in self.active_objects:
 			obj.draw(canvas)
 	
 	def update(self, delta_time):
-		for obj in self._objects:
+		for obj in self.active_objects:
 			obj.update(delta_time)
 	
 	def intersects(self, bbox) -> list:
 		intersections = []
-		for obj in self._objects:
+		for obj in self.active_objects:
 			if obj.sprite.intersects(bbox):
 				intersections.append(obj)
 		return intersections
+	
+	def intersects_sprite(self, sprite: Sprite) -> list:
+		# pixel accurate where the frames have collision masks
+		return [obj for obj in self.active_objects if obj.sprite.overlaps(sprite)]
+
+
+class SpriteGroup:
+	# members keep persistent canvas items tagged with the group tag, so a shared
+	# translation is one canvas.move(tag) instead of one redraw per member
+	_group_count = 0
+	
+	def __init__(self, members: list = None,
+				 direction: Direction = Direction.STOPPED,
+				 delay_time: int = 100, speed: int = 1) -> None:
+		super().__init__()
+		SpriteGroup._group_count += 1
+		self._tag = f'group{SpriteGroup._group_count}'
+		self._anchor = Sprite(0, 0, 0, 0)
+		self._mover = Mover(self._anchor, direction, delay_time, speed)
+		self._canvas = None
+		self._generation = 0
+		self._origin = (0, 0)
+		self._items = []
+		self._drawn = []
+		self._offset_x = 0
+		self._offset_y = 0
+		self._pending_x = 0
+		self._pending_y = 0
+		self.objects = members if members is not None else []
+	
+	@property
+	def tag(self):
+		return self._tag
+	
+	@property
+	def mover(self):
+		return self._mover
+	
+	@property
+	def objects(self):
+		return self._objects
+	
+	@objects.setter
+	def objects(self, value: list):
+		self._objects = list(value)
+		self._sprites = [m if isinstance(m, Sprite) else m.sprite for m in self._objects]
+		self.invalidate()
+	
+	def add(self, member):
+		self.objects = self._objects + [member]
+	
+	def remove(self, member):
+		self.objects = [m for m in self._objects if m is not member]
+	
+	def invalidate(self):
+		# forces the members to be recreated on the next draw
+		if self._canvas is not None:
+			self._canvas.delete(self._tag)
+		self._canvas = None
+	
+	def translate(self, dx: int, dy: int):
+		for sprite in self._sprites:
+			sprite.x += dx
+			sprite.y += dy
+		self._pending_x += dx
+		self._pending_y += dy
+	
+	def update(self, delta_time: int):
+		x, y = self._anchor.x, self._anchor.y
+		self._mover.update(delta_time)
+		if self._anchor.x != x or self._anchor.y != y:
+			self.translate(self._anchor.x - x, self._anchor.y - y)
+	
+	def intersects(self, bbox) -> list:
+		return [m for m, sprite in zip(self._objects, self._sprites) if sprite.intersects(bbox)]
+	
+	def _create(self, canvas: Canvas):
+		self.invalidate()
+		self._canvas = canvas
+		self._generation = getattr(canvas, 'generation', 0)
+		self._origin = (getattr(canvas, 'origin_x', 0), getattr(canvas, 'origin_y', 0))
+		self._items = []
+		self._drawn = []
+		self._offset_x = self._offset_y = 0
+		self._pending_x = self._pending_y = 0
+		tags = ('retained', self._tag)
+		for sprite in self._sprites:
+			# members are drawn as their image, or as their rectangle when they have none
+			if sprite.image is not None:
+				item = canvas.create_image(sprite.x, sprite.y, anchor=NW, image=sprite.image, tags=tags)
+			else:
+				item = canvas.create_rectangle(sprite.left, sprite.top, sprite.right, sprite.bottom,
+											   outline=sprite.border_color, fill=sprite.fill_color,
+											   width=sprite.border_width, tags=tags)
+			self._items.append(item)
+			self._drawn.append((sprite.x, sprite.y, sprite.image))
+	
+	def draw(self, canvas: Canvas):
+		# a rescaled canvas bumps its generation and needs the items recreated
+		if canvas is not self._canvas or getattr(canvas, 'generation', 0) != self._generation:
+			self._create(canvas)
+		else:
+			# a scrolled camera shifts every item by the same amount
+			origin = (getattr(canvas, 'origin_x', 0), getattr(canvas, 'origin_y', 0))
+			if origin != self._origin:
+				canvas.move(self._tag, self._origin[0] - origin[0], self._origin[1] - origin[1])
+				self._origin = origin
+			if self._pending_x or self._pending_y:
+				canvas.move(self._tag, self._pending_x, self._pending_y)
+				self._offset_x += self._pending_x
+				self._offset_y += self._pending_y
+				self._pending_x = self._pending_y = 0
+			ox, oy = self._offset_x, self._offset_y
+			# members that moved on their own or changed frame are fixed up individually
+			for i, sprite in enumerate(self._sprites):
+				x, y, image = self._drawn[i]
+				if sprite.x - ox != x or sprite.y - oy != y:
+					if image is not None:
+						canvas.coords(self._items[i], sprite.x, sprite.y)
+					else:
+						canvas.coords(self._items[i], sprite.left, sprite.top, sprite.right, sprite.bottom)
+					x, y = sprite.x - ox, sprite.y - oy
+				if sprite.image is not image:
+					if image is None or sprite.image is None:
+						self._create(canvas)
+						break
+					canvas.itemconfigure(self._items[i], image=sprite.image)
+					image = sprite.image
+				self._drawn[i] = (x, y, image)
+		# keeps the group stacked in draw order relative to the immediate-mode items
+		canvas.tag_raise(self._tag)
+
+
+def z_of(drawable) -> int:
+	# a drawable's own z, else its sprite's, else 0
+	z = getattr(drawable, 'z', None)
+	if z is None:
+		z = getattr(getattr(drawable, 'sprite', None), 'z', 0)
+	return z
+
+
+class RenderLayers:
+	# drawables kept sorted by z, in insertion order within a z. refresh() moves only the
+	# entries whose z changed (bisect insertion), the whole list is never re-sorted
+	
+	def __init__(self, drawables: list = None) -> None:
+		super().__init__()
+		self._keys = []  # sorted (z, sequence)
+		self._items = []
+		self._key_of = {}
+		self._explicit = {}  # drawable -> z given to add()/set_z(), for drawables without one
+		self._sequence = 0
+		for drawable in drawables or ():
+			self.add(drawable)
+	
+	def __iter__(self):
+		return iter(self._items)
+	
+	def __len__(self) -> int:
+		return len(self._items)
+	
+	def __contains__(self, drawable) -> bool:
+		return drawable in self._key_of
+	
+	def add(self, drawable, z: int = None):
+		if drawable in self._key_of:
+			self.remove(drawable)
+		if z is not None:
+			self._explicit[drawable] = z
+		else:
+			z = z_of(drawable)
+		self._sequence += 1
+		self._insert(drawable, (z, self._sequence))
+	
+	append = add  # drawables used to be a plain list
+	
+	def remove(self, drawable):
+		index = bisect.bisect_left(self._keys, self._key_of.pop(drawable))
+		del self._keys[index]
+		del self._items[index]
+		self._explicit.pop(drawable, None)
+	
+	def set_z(self, drawable, z: int):
+		self._explicit[drawable] = z
+		self._move(drawable, z)
+	
+	def refresh(self) -> int:
+		# call once per frame before drawing; returns how many entries moved
+		explicit = self._explicit
+		changed = []
+		for (old, _), item in zip(self._keys, self._items):
+			z = explicit[item] if item in explicit else z_of(item)
+			if z != old:
+				changed.append((item, z))
+		for item, z in changed:
+			self._move(item, z)
+		return len(changed)
+	
+	def _move(self, drawable, z: int):
+		key = self._key_of[drawable]
+		if key[0] == z:
+			return
+		index = bisect.bisect_left(self._keys, key)
+		del self._keys[index]
+		del self._items[index]
+		self._insert(drawable, (z, key[1]))  # keeps its insertion order within the new z
+	
+	def _insert(self, drawable, key: tuple):
+		index = bisect.bisect_right(self._keys, key)
+		self._keys.insert(index, key)
+		self._items.insert(index, drawable)
+		self._key_of[drawable] = key
+
+
+def iter_sprites(drawables):
+	# flattens drawables (sprites, animated wrappers, object collections) into their sprites
+	for d in drawables:
+		if isinstance(d, Sprite):
+			yield d
+		elif hasattr(d, 'objects'):
+			yield from iter_sprites(d.objects)
+		elif hasattr(d, 'sprite'):
+			yield d.sprite
+
+
+def iter_entities(items):
+	# flattens object collections into the individual animated entities they hold
+	for item in items:
+		if hasattr(item, 'objects'):
+			yield from iter_entities(item.objects)
+		else:
+			yield item
+
+
+def prime_image_sizes(entities):
+	# caches the size of every frame the entities can switch to (their sprite's image, animation
+	# and per-direction image lists); call on the Tk thread before updating them elsewhere
+	for entity in entities:
+		for owner in (entity, getattr(entity, '_animated_moving_sprite', None)):
+			if owner is None:
+				continue
+			lists = [getattr(owner, f'_{d.name.lower()}_images', None) for d in Direction]
+			animation = getattr(owner, 'animation', None)
+			if animation is not None:
+				lists.append(animation.images)
+			sprite = getattr(owner, 'sprite', None)
+			if sprite is not None and sprite.image is not None:
+				lists.append((sprite.image,))
+			for images in lists:
+				for image in images or ():
+					image_size(image)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StartupTrace:
+    # cold start timeline: marks are seconds since this module was imported
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.start = perf_counter()
+        self.enabled = bool(os.environ.get('FALLING_GAME_STARTUP_TRACE'))
+        self.finished = False
+        self.marks = {}
+        self.totals = {}
+        self._depth = {}
+        self._paint_callbacks = []
+
+    def mark(self, name: str):
+        if name not in self.marks:
+            self.marks[name] = perf_counter() - self.start
+
+    @contextmanager
+    def measure(self, category: str):
+        # nested measurements of the same category are only counted once
+        if self.finished:
+            yield
+            return
+        depth = self._depth.get(category, 0)
+        self._depth[category] = depth + 1
+        began = perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[category] = depth
+            if depth == 0:
+                self.totals[category] = self.totals.get(category, 0.0) + perf_counter() - began
+
+    def after_first_paint(self, callback):
+        if 'first frame' in self.marks:
+            callback()
+        else:
+            self._paint_callbacks.append(callback)
+
+    def watch_first_paint(self, widget):
+        # Tk redraws in an idle handler after the window is exposed, so an idle
+        # callback queued from the first <Expose> runs once the frame is on screen
+        def on_expose(evt):
+            widget.unbind('<Expose>', binding)
+            widget.after_idle(self._first_paint)
+
+        binding = widget.bind('<Expose>', on_expose, add='+')
+
+    def _first_paint(self):
+        self.mark('first frame')
+        self.finished = True
+        if self.enabled:
+            print(self.report(), file=sys.stderr)
+        callbacks, self._paint_callbacks = self._paint_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def report(self) -> str:
+        lines = ['startup trace (ms since launch):']
+        for name, seconds in self.marks.items():
+            lines.append(f'  {name:<20}{seconds * 1000:9.1f}')
+        for category, seconds in self.totals.items():
+            lines.append(f'  {category + " total":<20}{seconds * 1000:9.1f}')
+        return '\n'.join(lines)
+
+
+startup_trace = StartupTrace()
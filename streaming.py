@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from spritelib import Sprite, PlatformIndex
+
+# Levels larger than the screen, cut into fixed size chunks stored one JSON file each:
+#   level.json           {"chunk_width": 800, "chunk_height": 600, "columns": 40, "rows": 2}
+#   chunk_<cx>_<cy>.json {"platforms": [[x, y, width, height], ...],
+#                         "entities": [{"type": "bouncer", "x": 120, "y": 40, ...}, ...]}
+# Everything is in level (world) coordinates. Missing chunk files are empty chunks.
+
+
+def chunk_filename(cx: int, cy: int) -> str:
+    return f'chunk_{cx}_{cy}.json'
+
+
+def read_chunk(path: str):
+    # runs on the loader thread: file IO and JSON parsing only, no Tk objects
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_level(path: str, chunk_width: int, chunk_height: int, platforms: list, entities: list = ()) -> dict:
+    # cuts a whole level description into chunk files; platforms and entities belong to the
+    # chunk holding their top left corner, so keep platforms no wider than a chunk
+    os.makedirs(path, exist_ok=True)
+    chunks = {}
+    for platform in platforms:
+        key = (platform[0] // chunk_width, platform[1] // chunk_height)
+        chunks.setdefault(key, {'platforms': [], 'entities': []})['platforms'].append(list(platform))
+    for entity in entities:
+        key = (entity['x'] // chunk_width, entity['y'] // chunk_height)
+        chunks.setdefault(key, {'platforms': [], 'entities': []})['entities'].append(dict(entity))
+    meta = {
+        'chunk_width': chunk_width, 'chunk_height': chunk_height,
+        'columns': max((cx for cx, _ in chunks), default=0) + 1,
+        'rows': max((cy for _, cy in chunks), default=0) + 1,
+    }
+    with open(os.path.join(path, 'level.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    for (cx, cy), data in chunks.items():
+        with open(os.path.join(path, chunk_filename(cx, cy)), 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    return meta
+
+
+class Camera:
+    # the part of the level shown on the canvas; follows a sprite with a dead zone and
+    # stays inside the level bounds
+
+    def __init__(self, width: int = 800, height: int = 600, x: int = 0, y: int = 0,
+                 target: Sprite = None, dead_zone: tuple = (0.4, 0.4), bounds: tuple = None) -> None:
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+        self.target = target
+        self.dead_zone = dead_zone  # fraction of the view the target moves in freely
+        self.bounds = bounds  # (width, height) of the level
+
+    def view(self) -> tuple:
+        return self.x, self.y, self.x + self.width, self.y + self.height
+
+    def follow(self, sprite: Sprite):
+        zone_w = self.width * self.dead_zone[0]
+        zone_h = self.height * self.dead_zone[1]
+        left = self.x + (self.width - zone_w) / 2
+        top = self.y + (self.height - zone_h) / 2
+        if sprite.left < left:
+            self.x -= left - sprite.left
+        elif sprite.right > left + zone_w:
+            self.x += sprite.right - (left + zone_w)
+        if sprite.top < top:
+            self.y -= top - sprite.top
+        elif sprite.bottom > top + zone_h:
+            self.y += sprite.bottom - (top + zone_h)
+        self.x, self.y = int(self.x), int(self.y)
+        self.clamp()
+
+    def center_on(self, sprite: Sprite):
+        self.x = sprite.x + sprite.width // 2 - self.width // 2
+        self.y = sprite.y + sprite.height // 2 - self.height // 2
+        self.clamp()
+
+    def clamp(self):
+        if self.bounds is not None:
+            self.x = max(0, min(self.x, self.bounds[0] - self.width))
+            self.y = max(0, min(self.y, self.bounds[1] - self.height))
+
+    def update(self, delta_time: int):
+        if self.target is not None:
+            self.follow(self.target)
+
+
+class Chunk:
+    def __init__(self, cx: int, cy: int, platforms: list, entities: list) -> None:
+        super().__init__()
+        self.cx = cx
+        self.cy = cy
+        self.platforms = platforms
+        self.entities = entities
+
+
+class ChunkedLevel:
+    # updateable and drawable for a streamed level. Chunks within load_margin chunks of the
+    # camera are read on a loader thread and instantiated on the Tk thread as they arrive;
+    # chunks beyond unload_margin are dropped, so memory and update cost follow the camera,
+    # not the level size. Only entities within active_margin chunks are updated.
+    # Entities come from factories[type](spec, level); an unloaded chunk forgets their state
+    # and respawns them from its file when the camera comes back.
+
+    def __init__(self, path: str, camera: Camera, factories: dict = None,
+                 load_margin: int = 1, unload_margin: int = 2, active_margin: int = 1,
+                 platform_color: str = 'gray', max_instantiate: int = 2, executor=None) -> None:
+        super().__init__()
+        self.path = path
+        with open(os.path.join(path, 'level.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.chunk_width = meta['chunk_width']
+        self.chunk_height = meta['chunk_height']
+        self.columns = meta['columns']
+        self.rows = meta['rows']
+        self.camera = camera
+        if camera.bounds is None:
+            camera.bounds = (self.width, self.height)
+        self.factories = factories if factories is not None else {}
+        self.load_margin = load_margin
+        self.unload_margin = max(unload_margin, load_margin)
+        self.active_margin = min(active_margin, self.load_margin)
+        self.platform_color = platform_color
+        self.max_instantiate = max_instantiate  # per tick, so a burst of arrivals does not hitch
+        self.platform_index = PlatformIndex()  # shared by every jumper in the level
+        self.persistent = []  # e.g. the player: always updated and drawn, never unloaded
+        self.chunks = {}
+        self.active_entities = []
+        self._pending = {}
+        self._arrived = []
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._active_key = None
+
+    @property
+    def width(self) -> int:
+        return self.columns * self.chunk_width
+
+    @property
+    def height(self) -> int:
+        return self.rows * self.chunk_height
+
+    def add(self, entity):
+        self.persistent.append(entity)
+
+    def chunk_at(self, x: int, y: int) -> tuple:
+        return int(x) // self.chunk_width, int(y) // self.chunk_height
+
+    def chunks_around(self, margin: int) -> set:
+        left, top, right, bottom = self.camera.view()
+        cx0, cy0 = self.chunk_at(left, top)
+        cx1, cy1 = self.chunk_at(right - 1, bottom - 1)
+        return {(cx, cy)
+                for cx in range(max(0, cx0 - margin), min(self.columns, cx1 + margin + 1))
+                for cy in range(max(0, cy0 - margin), min(self.rows, cy1 + margin + 1))}
+
+    def preload(self):
+        # blocking load of the chunks around the camera, for the first frame of a level
+        for key in self.chunks_around(self.load_margin):
+            if key not in self.chunks:
+                self._pending.pop(key, None)
+                self._instantiate(key, read_chunk(self._chunk_path(key)))
+        self._changed()
+
+    def stream(self):
+        wanted = self.chunks_around(self.load_margin)
+        for key in wanted:
+            if key not in self.chunks and key not in self._pending:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chunks')
+                self._pending[key] = self._executor.submit(read_chunk, self._chunk_path(key))
+        changed = False
+        for key, future in list(self._pending.items()):
+            if future.done():
+                del self._pending[key]
+                if key in wanted:
+                    self._arrived.append((key, future.result()))
+            elif key not in wanted and future.cancel():
+                del self._pending[key]
+        for key, data in self._arrived[:self.max_instantiate]:
+            if key not in self.chunks:
+                self._instantiate(key, data)
+                changed = True
+        del self._arrived[:self.max_instantiate]
+        keep = self.chunks_around(self.unload_margin)
+        for key in [key for key in self.chunks if key not in keep]:
+            self._unload(self.chunks.pop(key))
+            changed = True
+        if changed:
+            self._changed()
+        elif self._active_key != self.chunk_at(self.camera.x, self.camera.y):
+            self._activate()
+
+    def close(self):
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for chunk in self.chunks.values():
+            self._unload(chunk)
+        self.chunks.clear()
+        self._changed()
+
+    def _chunk_path(self, key: tuple) -> str:
+        return os.path.join(self.path, chunk_filename(*key))
+
+    def _instantiate(self, key: tuple, data):
+        # Tk thread: sprites and entities may create images, so they are only built here
+        data = data or {}
+        platforms = [Sprite(x, y, w, h, fill_color=self.platform_color)
+                     for x, y, w, h in data.get('platforms', ())]
+        entities = []
+        for spec in data.get('entities', ()):
+            factory = self.factories.get(spec.get('type'))
+            if factory is not None:
+                entities.append(factory(spec, self))
+        self.chunks[key] = Chunk(key[0], key[1], platforms, entities)
+
+    def _unload(self, chunk: Chunk):
+        for entity in chunk.entities:
+            invalidate = getattr(entity, 'invalidate', None)  # retained sprite groups
+            if invalidate is not None:
+                invalidate()
+
+    def _changed(self):
+        self.platform_index.build([p for chunk in self.chunks.values() for p in chunk.platforms])
+        self._activate()
+
+    def _activate(self):
+        self._active_key = self.chunk_at(self.camera.x, self.camera.y)
+        nearby = self.chunks_around(self.active_margin)
+        self.active_entities = [entity for key, chunk in self.chunks.items() if key in nearby
+                                for entity in chunk.entities]
+
+    def update(self, delta_time: int):
+        for entity in self.persistent:
+            entity.update(delta_time)
+        self.camera.update(delta_time)
+        self.stream()
+        for entity in self.active_entities:
+            entity.update(delta_time)
+
+    def draw(self, canvas):
+        # the canvas shows the camera view; platforms are culled to it. A platform belongs to
+        # the chunk of its top left corner, so one anchored left of or above the view can
+        # still reach into it: look one chunk further out
+        view = self.camera.view()
+        visible = self.chunks_around(1)
+        with canvas.translated(self.camera.x, self.camera.y):
+            for key in visible:
+                chunk = self.chunks.get(key)
+                if chunk is not None:
+                    for platform in chunk.platforms:
+                        if platform.intersects(view):
+                            platform.draw(canvas)
+            for entity in self.active_entities:
+                entity.draw(canvas)
+            for entity in self.persistent:
+                entity.draw(canvas)
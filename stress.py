@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import sys
+from time import perf_counter
+from tkinter import Tk, PhotoImage, TclError
+
+from spritelib import Sprite, Direction, SpriteGroup, AnimatedRandomFallingObjects, \
+    AnimatedHorizontalBouncer, AnimatedHorizontalRepeater, AnimatedPlatformer
+from ecs import World
+from game_gui_lib import AnimatedGameFrame
+from soak import VirtualClock
+
+# Capacity curves: for each sprite class and renderer, ramps the entity count until a tick
+# (update + draw + Tk repaint) misses the frame budget and reports frame time against count.
+# Needs a display (xvfb-run -a python stress.py on servers); images are plain Tk PhotoImages.
+
+CLASSES = ('falling', 'bouncer', 'repeater', 'platformer')
+RENDERERS = ('immediate', 'group', 'ecs')
+
+
+def make_images(colors: list, size: int = 32) -> list:
+    images = []
+    for color in colors:
+        image = PhotoImage(width=size, height=size)
+        image.put(color, to=(4, 4, size - 4, size - 4))
+        images.append(image)
+    return images
+
+
+class StressScene:
+    def __init__(self, frame: AnimatedGameFrame, images: dict, rng: random.Random) -> None:
+        super().__init__()
+        self.frame = frame
+        self.images = images
+        self.rng = rng
+        self.platforms = [Sprite(rng.randrange(0, 700), 150 + 100 * (i % 4), 120, 12)
+                          for i in range(16)]
+        self.jumpers = []
+
+    def entities(self, kind: str, count: int) -> list:
+        rng, left, right = self.rng, self.images['left'], self.images['right']
+        if kind == 'falling':
+            return [AnimatedRandomFallingObjects(self.images['down'], count)]
+        if kind == 'bouncer':
+            return [AnimatedHorizontalBouncer(left, right, rng.randrange(0, 760), rng.randrange(0, 560),
+                                              direction=rng.choice((Direction.LEFT, Direction.RIGHT)),
+                                              delay_time=rng.randrange(5, 30), speed=rng.randrange(1, 5))
+                    for _ in range(count)]
+        if kind == 'repeater':
+            return [AnimatedHorizontalRepeater(left, right, rng.randrange(0, 760), rng.randrange(0, 560),
+                                               direction=rng.choice((Direction.LEFT, Direction.RIGHT)),
+                                               delay_time=rng.randrange(5, 30), speed=rng.randrange(1, 5))
+                    for _ in range(count)]
+        if kind == 'platformer':
+            return [AnimatedPlatformer(left, right, rng.randrange(0, 760), rng.randrange(0, 300),
+                                       direction=rng.choice((Direction.LEFT, Direction.RIGHT)),
+                                       platforms=self.platforms)
+                    for _ in range(count)]
+        raise ValueError(f'unknown sprite class {kind}')
+
+    def build(self, kind: str, renderer: str, count: int) -> bool:
+        # False when the renderer cannot host this class
+        frame = self.frame
+        frame.canvas.delete('all')
+        entities = self.entities(kind, count)
+        if renderer == 'immediate':
+            frame.updateables = list(entities)
+            frame.drawables = list(entities)
+        elif renderer == 'group':
+            members = entities[0].objects if kind == 'falling' else entities
+            frame.updateables = list(entities)
+            frame.drawables = [SpriteGroup(members)]
+        elif renderer == 'ecs':
+            if kind == 'falling':
+                return False  # falling objects respawn through their own logic, not adoptable
+            world = World()
+            for entity in entities:
+                world.adopt(entity, drawn=True)
+            frame.updateables = [world]
+            frame.drawables = [world]
+        self.jumpers = [e.jumper for e in entities if kind == 'platformer']
+        return True
+
+    def tick(self, step: int, index: int) -> tuple:
+        frame = self.frame
+        frame.clock.advance(step)
+        if self.jumpers and index % 50 == 0:
+            for jumper in self.jumpers:
+                jumper.jump()
+        began = perf_counter()
+        frame.update()
+        updated = perf_counter()
+        frame.draw()
+        drawn = perf_counter()
+        frame.update_idletasks()  # the canvas repaint happens in an idle handler
+        painted = perf_counter()
+        return (updated - began) * 1000, (drawn - updated) * 1000, (painted - drawn) * 1000
+
+
+def measure(scene: StressScene, args, kind: str, renderer: str, count: int):
+    if not scene.build(kind, renderer, count):
+        return None
+    for i in range(args.warmup_ticks):
+        scene.tick(args.step, i)
+    samples = [scene.tick(args.step, i) for i in range(args.ticks)]
+    totals = sorted(sum(sample) for sample in samples)
+    return {
+        'class': kind, 'renderer': renderer, 'count': count,
+        'mean_ms': round(sum(totals) / len(totals), 3),
+        'p95_ms': round(totals[min(len(totals) - 1, int(len(totals) * 0.95))], 3),
+        'update_ms': round(sum(s[0] for s in samples) / len(samples), 3),
+        'draw_ms': round(sum(s[1] for s in samples) / len(samples), 3),
+        'paint_ms': round(sum(s[2] for s in samples) / len(samples), 3),
+    }
+
+
+def ramp(scene: StressScene, args, kind: str, renderer: str):
+    # grows the count geometrically until the budget is missed, then bisects the last step
+    points = []
+    passed, failed = 0, None
+    count = args.start
+    while count <= args.max_count:
+        point = measure(scene, args, kind, renderer, count)
+        if point is None:
+            return points, None
+        points.append(point)
+        print(f'{kind:<11}{renderer:<10}{count:>7}{point["mean_ms"]:>9.2f}{point["p95_ms"]:>9.2f}', flush=True)
+        if point[args.metric] > args.budget:
+            failed = count
+            break
+        passed = count
+        count = max(count + 1, int(count * args.factor))
+    for _ in range(args.refine):
+        if failed is None or failed - passed <= 1:
+            break
+        count = (passed + failed) // 2
+        point = measure(scene, args, kind, renderer, count)
+        points.append(point)
+        if point[args.metric] > args.budget:
+            failed = count
+        else:
+            passed = count
+    points.sort(key=lambda p: p['count'])
+    return points, passed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='entity count capacity per sprite class and renderer')
+    parser.add_argument('--classes', nargs='+', choices=CLASSES, default=list(CLASSES))
+    parser.add_argument('--renderers', nargs='+', choices=RENDERERS, default=list(RENDERERS))
+    parser.add_argument('--budget', type=float, default=16.0, help='frame budget in ms')
+    parser.add_argument('--metric', choices=('mean_ms', 'p95_ms'), default='p95_ms')
+    parser.add_argument('--start', type=int, default=10)
+    parser.add_argument('--factor', type=float, default=1.5)
+    parser.add_argument('--max-count', type=int, default=20000)
+    parser.add_argument('--refine', type=int, default=4, help='bisection steps after the budget is missed')
+    parser.add_argument('--ticks', type=int, default=120, help='measured ticks per count')
+    parser.add_argument('--warmup-ticks', type=int, default=20)
+    parser.add_argument('--step', type=int, default=16, help='virtual ms per tick')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', default='stress_report.json')
+    parser.add_argument('--csv', help='also write the curve points as CSV')
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+    try:
+        root = Tk()
+    except TclError as e:
+        print(f'stress needs a display ({e}); try: xvfb-run -a python stress.py', file=sys.stderr)
+        return 2
+    try:
+        frame = AnimatedGameFrame(root, paused=True)
+        frame.pack()
+        frame.clock = VirtualClock(frame.clock())
+        images = {
+            'left': make_images(['#c03030', '#d04040', '#e05050', '#f06060']),
+            'right': make_images(['#3030c0', '#4040d0', '#5050e0', '#6060f0']),
+            'down': make_images(['#c0c030', '#d0d040', '#e0e050', '#f0f060']),
+        }
+        scene = StressScene(frame, images, random.Random(args.seed))
+        root.update()
+        curves, capacity = [], {}
+        for kind in args.classes:
+            for renderer in args.renderers:
+                points, passed = ramp(scene, args, kind, renderer)
+                curves.extend(points)
+                capacity[f'{kind}/{renderer}'] = passed
+    finally:
+        root.destroy()
+    report = {'budget_ms': args.budget, 'metric': args.metric, 'ticks': args.ticks,
+              'capacity': capacity, 'curves': curves}
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(curves[0]) if curves else ['class'])
+            writer.writeheader()
+            writer.writerows(curves)
+    print('capacity (entities within budget):')
+    for key, passed in capacity.items():
+        print(f'  {key:<24}{"n/a" if passed is None else passed}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
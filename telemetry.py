@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from time import time_ns
+
+
+class TelemetryEmitter:
+    # emit() runs on the frame loop: it only appends a tuple to a bounded deque,
+    # deque append/popleft are atomic so the writer thread drains it without a lock
+
+    def __init__(self, capacity: int = 4096, enabled: bool = False,
+                 stats_interval: int = 1000) -> None:
+        super().__init__()
+        self.capacity = capacity
+        self.enabled = enabled
+        self.stats_interval = stats_interval
+        self.emitted = 0
+        self.dropped = 0
+        self._queue = deque()
+        self._frames = 0
+        self._frame_total = 0
+        self._frame_max = 0
+        self._stats_elapsed = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def emit(self, kind: str, *values):
+        if not self.enabled:
+            return
+        if len(self._queue) >= self.capacity:
+            self.dropped += 1
+            return
+        self._queue.append((time_ns() // 1_000_000, kind, values))
+        self.emitted += 1
+
+    def frame(self, delta_time: int):
+        # frame times are aggregated here and reported once per stats_interval
+        if not self.enabled:
+            return
+        self._frames += 1
+        self._frame_total += delta_time
+        self._stats_elapsed += delta_time
+        if delta_time > self._frame_max:
+            self._frame_max = delta_time
+        if self._stats_elapsed >= self.stats_interval:
+            self.emit('frame_stats', self._frames, round(self._frame_total / self._frames, 2),
+                      self._frame_max)
+            self._frames = 0
+            self._frame_total = 0
+            self._frame_max = 0
+            self._stats_elapsed = 0
+
+    def drain(self, limit: int = 512) -> list:
+        batch = []
+        popleft = self._queue.popleft
+        try:
+            while len(batch) < limit:
+                batch.append(popleft())
+        except IndexError:
+            pass
+        return batch
+
+
+class TelemetryWriter:
+    # background thread batching emitter events into rotating JSONL files
+
+    def __init__(self, emitter: TelemetryEmitter, path: str, max_bytes: int = 5_000_000,
+                 backup_count: int = 5, flush_interval: float = 0.5, batch_size: int = 512) -> None:
+        super().__init__()
+        self.emitter = emitter
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.written = 0
+        self._reported_drops = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+
+    def start(self):
+        self._stop.clear()
+        self.emitter.enabled = True
+        self._thread = threading.Thread(target=self._run, name='telemetry-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.emitter.enabled = False
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+        try:
+            while not self._stop.wait(self.flush_interval):
+                self.flush()
+            self.flush()
+        finally:
+            self._file.close()
+            self._file = None
+
+    def flush(self):
+        lines = []
+        while True:
+            batch = self.emitter.drain(self.batch_size)
+            if not batch:
+                break
+            lines.extend(json.dumps({'t': t, 'e': kind, 'v': values}, separators=(',', ':'))
+                         for t, kind, values in batch)
+        dropped = self.emitter.dropped
+        if dropped != self._reported_drops:
+            lines.append(json.dumps({'t': time_ns() // 1_000_000, 'e': 'dropped',
+                                     'v': [dropped - self._reported_drops]}, separators=(',', ':')))
+            self._reported_drops = dropped
+        if not lines:
+            return
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+        self.written += len(lines)
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f'{self.path}.{i}'
+                if os.path.exists(source):
+                    os.replace(source, f'{self.path}.{i + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
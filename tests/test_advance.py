@@ -0,0 +1,131 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spritelib import Sprite, Mover, Animation, Direction, AnimatedHorizontalBouncer, \
+    AnimatedHorizontalRepeater, AnimatedVerticalBouncer, AnimatedVerticalRepeater
+
+
+class FakeImage:
+    # stands in for PhotoImage, no Tk needed
+    def __init__(self, width: int = 32, height: int = 32) -> None:
+        self._width = width
+        self._height = height
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+
+def state_of(entity) -> tuple:
+    sprite, mover, animation = entity.sprite, entity.mover, entity.animation
+    return (sprite.x, sprite.y, sprite.image, mover.direction, mover.elapsed_time,
+            animation.images, animation.current_frame, animation.elapsed_time)
+
+
+class AdvanceTest(unittest.TestCase):
+    # advance(ms, tick) must equal update(tick) ms // tick times plus update(ms % tick) once
+
+    def updates(self, target, ms: int, tick: int):
+        for _ in range(ms // tick):
+            target.update(tick)
+        if ms % tick:
+            target.update(ms % tick)
+
+    def test_mover(self):
+        rng = random.Random(48)
+        for _ in range(500):
+            delay, speed, tick = rng.randrange(1, 60), rng.randrange(0, 9), rng.randrange(1, 40)
+            direction = rng.choice([Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN])
+            ms = rng.randrange(0, 3000)
+            stepped, advanced = Sprite(100, 100), Sprite(100, 100)
+            a, b = Mover(stepped, direction, delay, speed), Mover(advanced, direction, delay, speed)
+            elapsed = rng.randrange(0, delay)
+            a.elapsed_time = b.elapsed_time = elapsed
+            self.updates(a, ms, tick)
+            b.advance(ms, tick)
+            self.assertEqual((stepped.x, stepped.y, a.elapsed_time), (advanced.x, advanced.y, b.elapsed_time))
+
+    def test_animation_wraps(self):
+        rng = random.Random(480)
+        wrapped = 0
+        for _ in range(500):
+            images = [FakeImage() for _ in range(rng.randrange(1, 6))]
+            delay, tick, ms = rng.randrange(0, 80), rng.randrange(1, 40), rng.randrange(0, 3000)
+            a, b = Animation(Sprite(), images, delay), Animation(Sprite(), images, delay)
+            for _ in range(ms // tick):
+                frame = a.current_frame
+                a.update(tick)
+                wrapped += a.current_frame < frame
+            if ms % tick:
+                a.update(ms % tick)
+            b.advance(ms, tick)
+            self.assertEqual((a.current_frame, a.elapsed_time, a.current_image),
+                             (b.current_frame, b.elapsed_time, b.current_image))
+        self.assertGreater(wrapped, 0, 'no case wrapped the animation')
+
+    def make_pair(self, cls, forward: Direction, backward: Direction, vertical: bool, limits: dict, rng,
+                  lengths: tuple):
+        images_a, images_b = [FakeImage() for _ in range(lengths[0])], [FakeImage() for _ in range(lengths[1])]
+        direction = rng.choice([forward, backward])
+        position = rng.randrange(20, 150)
+        x, y = (10, position) if vertical else (position, 10)
+
+        def make(params):
+            return cls(images_a, images_b, x, y, direction=direction, **params, **limits)
+        return make
+
+    def run_entity(self, cls, forward, backward, vertical, limits, seed, lengths: tuple = (4, 4)):
+        rng = random.Random(seed)
+        turns = 0
+        for _ in range(300):
+            make = self.make_pair(cls, forward, backward, vertical, limits, rng, lengths)
+            params = dict(delay_time=rng.randrange(1, 50), speed=rng.randrange(1, 12),
+                          frame_delay=rng.randrange(1, 80))
+            stepped, advanced = make(params), make(params)
+            tick, ms = rng.randrange(1, 40), rng.randrange(0, 5000)
+            start = (stepped.mover.direction, stepped.sprite.y if vertical else stepped.sprite.x)
+            try:
+                self.updates(stepped, ms, tick)
+            except IndexError:
+                # update() itself fails when a bounce switches to a shorter list past its end
+                with self.assertRaises(IndexError):
+                    advanced.advance(ms, tick)
+                continue
+            advanced.advance(ms, tick)
+            self.assertEqual(state_of(stepped), state_of(advanced), f'{cls.__name__} {params} tick {tick} ms {ms}')
+            position = stepped.sprite.y if vertical else stepped.sprite.x
+            moved_forward = position > start[1]
+            turns += stepped.mover.direction != start[0] or (start[0] == forward) != moved_forward
+        self.assertGreater(turns, 0, 'no case bounced or wrapped')
+
+    def test_horizontal_bouncer(self):
+        self.run_entity(AnimatedHorizontalBouncer, Direction.RIGHT, Direction.LEFT, False,
+                        dict(left_limit=0, right_limit=200), 1)
+
+    def test_bouncers_with_lists_of_different_lengths(self):
+        self.run_entity(AnimatedHorizontalBouncer, Direction.RIGHT, Direction.LEFT, False,
+                        dict(left_limit=0, right_limit=200), 5, lengths=(3, 5))
+        self.run_entity(AnimatedVerticalBouncer, Direction.DOWN, Direction.UP, True,
+                        dict(top_limit=0, bottom_limit=200), 6, lengths=(5, 3))
+
+    def test_horizontal_repeater(self):
+        self.run_entity(AnimatedHorizontalRepeater, Direction.RIGHT, Direction.LEFT, False,
+                        dict(left_limit=0, right_limit=200), 2)
+
+    def test_vertical_bouncer(self):
+        self.run_entity(AnimatedVerticalBouncer, Direction.DOWN, Direction.UP, True,
+                        dict(top_limit=0, bottom_limit=200), 3)
+
+    def test_vertical_repeater(self):
+        self.run_entity(AnimatedVerticalRepeater, Direction.DOWN, Direction.UP, True,
+                        dict(top_limit=0, bottom_limit=200), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
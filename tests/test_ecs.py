@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ecs import World
+from spritelib import AnimatedVerticalBouncer, AnimatedHorizontalBouncer, Direction
+
+
+class FakeImage:
+    # stands in for PhotoImage, no Tk needed
+    def __init__(self, name: str, width: int = 32, height: int = 32) -> None:
+        self.name = name
+        self._width = width
+        self._height = height
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+
+def frames(prefix: str, count: int = 4) -> list:
+    return [FakeImage(f'{prefix}{i}') for i in range(count)]
+
+
+class AdoptedAnimationTest(unittest.TestCase):
+
+    def assert_same_frames(self, make, ticks: int = 200, delta: int = 30):
+        legacy, adopted = make(), make()
+        world = World()
+        world.adopt(adopted)
+        directions = set()
+        for tick in range(ticks):
+            legacy.update(delta)
+            world.update(delta)
+            self.assertEqual((legacy.animation.current_frame, legacy.sprite.image.name,
+                              legacy.sprite.x, legacy.sprite.y, legacy.mover.direction),
+                             (adopted.animation.current_frame, adopted.sprite.image.name,
+                              adopted.sprite.x, adopted.sprite.y, adopted.mover.direction),
+                             f'tick {tick}')
+            directions.add(adopted.mover.direction)
+        self.assertEqual(len(directions), 2, 'the entity should have bounced')
+
+    def test_vertical_bouncer_steps_animation_twice(self):
+        up, down = frames('up'), frames('down')
+        self.assert_same_frames(lambda: AnimatedVerticalBouncer(up, down, 10, 100, delay_time=20, speed=7,
+                                                                frame_delay=50, top_limit=0, bottom_limit=300))
+
+    def test_horizontal_bouncer(self):
+        left, right = frames('left'), frames('right')
+        self.assert_same_frames(lambda: AnimatedHorizontalBouncer(left, right, 100, 10, direction=Direction.RIGHT,
+                                                                  delay_time=20, speed=7, frame_delay=50,
+                                                                  left_limit=0, right_limit=300))
+
+
+if __name__ == '__main__':
+    unittest.main()
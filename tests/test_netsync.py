@@ -0,0 +1,78 @@
+import os
+import random
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netsync import ImageCatalog, NO_IMAGE, MSG_DELTA, encode_delta, decode_delta
+
+
+def body_of(message: bytes) -> bytes:
+    length = struct.unpack('!I', message[:4])[0]
+    body = message[4:]
+    assert len(body) == length
+    return body
+
+
+def random_state(rng: random.Random, previous: dict) -> dict:
+    state = {}
+    for eid, record in previous.items():
+        if rng.random() < 0.1:
+            continue  # removed
+        if rng.random() < 0.4:
+            x, y, width, height, image_id = record
+            record = (x + rng.randrange(-5, 6), y + rng.randrange(-5, 6), width, height,
+                      rng.choice((image_id, rng.randrange(0, 20), NO_IMAGE)))
+        state[eid] = record
+    for _ in range(rng.randrange(0, 5)):
+        eid = rng.randrange(1, 10_000)
+        state[eid] = (rng.randrange(-1000, 1000), rng.randrange(-1000, 1000), rng.randrange(0, 100),
+                      rng.randrange(0, 100), rng.randrange(0, 20))
+    return state
+
+
+class DeltaCodecTest(unittest.TestCase):
+
+    def test_roundtrip_against_acked_bases(self):
+        rng = random.Random(27)
+        sent = {0: {}}
+        received = {}
+        state = {}
+        for tick in range(1, 300):
+            state = random_state(rng, state)
+            base_tick = rng.choice(list(sent)[-4:])  # a delta is against some acknowledged tick
+            message = encode_delta(tick, base_tick, sent[base_tick], state)
+            self.assertEqual(body_of(message)[0], MSG_DELTA)
+            decoded_tick, decoded_base, decoded = decode_delta(body_of(message), received)
+            self.assertEqual((decoded_tick, decoded_base), (tick, base_tick))
+            self.assertEqual(decoded, state)
+            sent[tick] = state
+            received[tick] = decoded
+
+    def test_unchanged_state_sends_no_entities(self):
+        state = {1: (10, 20, 32, 32, 0), 2: (-5, 7, 16, 16, NO_IMAGE)}
+        full = encode_delta(1, 0, {}, state)
+        empty = encode_delta(2, 1, state, state)
+        self.assertLess(len(empty), len(full))
+        self.assertEqual(decode_delta(body_of(empty), {1: state})[2], state)
+
+
+class ImageCatalogTest(unittest.TestCase):
+
+    def test_ids_line_up_in_registration_order(self):
+        server, client = ImageCatalog(), ImageCatalog()
+        images = [object() for _ in range(5)]
+        self.assertEqual(server.register(images), [0, 1, 2, 3, 4])
+        self.assertEqual(server.register(images[2:] + [images[0]]), [2, 3, 4, 0])
+        client_images = [object() for _ in range(5)]
+        client.register(client_images)
+        for image in images:
+            self.assertIs(client.image(server.id_of(image)), client_images[images.index(image)])
+        self.assertEqual(server.id_of(None), NO_IMAGE)
+        self.assertIsNone(client.image(NO_IMAGE))
+
+
+if __name__ == '__main__':
+    unittest.main()
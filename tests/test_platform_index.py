@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spritelib import Sprite, Jumper, PlatformIndex
+
+
+def touches(box, b) -> bool:
+    left, top, right, bottom = box
+    return not (right < b[0] or left > b[2] or bottom < b[1] or top > b[3])
+
+
+def brute_sweep(platforms: list, box, dy: int):
+    left, top, right, bottom = box
+    best = None
+    for p in platforms:
+        b = p.bbox()
+        if right < b[0] or left > b[2]:
+            continue
+        if dy > 0 and bottom <= b[1] <= bottom + dy and (best is None or b[1] < best.top):
+            best = p
+        elif dy < 0 and top + dy <= b[3] <= top and (best is None or b[3] > best.bottom):
+            best = p
+    return best
+
+
+class PlatformIndexTest(unittest.TestCase):
+
+    def test_queries_match_brute_force(self):
+        rng = random.Random(26)
+        for _ in range(50):
+            platforms = [Sprite(rng.randrange(-100, 900), rng.randrange(-100, 700),
+                                rng.randrange(1, 200), rng.randrange(1, 40)) for _ in range(rng.randrange(0, 60))]
+            index = PlatformIndex(platforms, cell_size=rng.choice((16, 64, 100)))
+            for _ in range(100):
+                x, y = rng.randrange(-150, 950), rng.randrange(-150, 750)
+                box = (x, y, x + rng.randrange(0, 60), y + rng.randrange(0, 60))
+                hits = [p for p in platforms if touches(box, p.bbox())]
+                self.assertIs(index.query(box), hits[0] if hits else None)
+                self.assertEqual(index.query_all(box), hits)
+                dy = rng.choice((-1, 1)) * rng.randrange(1, 80)
+                self.assertIs(index.sweep(box, dy), brute_sweep(platforms, box, dy))
+
+    def test_rebuilds_after_platforms_moved(self):
+        platforms = [Sprite(0, 300, 800, 10)]
+        sprite = Sprite(100, 100, 20, 20)
+        jumper = Jumper(sprite, platforms=platforms)
+        for _ in range(10):
+            jumper.update(10)
+        platforms[0].y = 200
+        PlatformIndex.platforms_moved()
+        for _ in range(300):
+            jumper.update(10)
+        self.assertEqual(sprite.bottom, 200)
+        self.assertFalse(jumper.is_jumping)
+
+    def test_rebuilds_when_platforms_added(self):
+        platforms = []
+        sprite = Sprite(100, 100, 20, 20)
+        jumper = Jumper(sprite, platforms=platforms)
+        platforms.append(Sprite(0, 150, 800, 10))
+        for _ in range(300):
+            jumper.update(10)
+        self.assertEqual(sprite.bottom, 150)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshot import GameSnapshot
+from spritelib import Sprite, Direction, AnimatedHorizontalBouncer, AnimatedPlatformer
+
+
+class FakeImage:
+    # stands in for PhotoImage, no Tk needed
+    def __init__(self, width: int = 32, height: int = 32) -> None:
+        self._width = width
+        self._height = height
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+
+def make_entities() -> list:
+    left, right = [FakeImage() for _ in range(4)], [FakeImage() for _ in range(4)]
+    platforms = [Sprite(0, 400, 800, 10)]
+    return [Sprite(5, 6, 10, 10),
+            AnimatedHorizontalBouncer(left, right, 100, 50, delay_time=20, speed=3, frame_delay=40),
+            AnimatedPlatformer(left, right, 300, 100, platforms=platforms)]
+
+
+def state_of(entities: list) -> list:
+    state = []
+    for entity in entities:
+        if isinstance(entity, Sprite):
+            state.append((entity.x, entity.y))
+            continue
+        sprite, mover, animation = entity.sprite, entity.mover, entity.animation
+        state.append((sprite.x, sprite.y, sprite.image, mover.direction, mover.elapsed_time,
+                      animation.images, animation.current_frame, animation.elapsed_time))
+    return state
+
+
+class GameSnapshotTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        entities = make_entities()
+        for _ in range(37):
+            for entity in entities[1:]:
+                entity.update(15)
+        entities[2].mover.direction = Direction.LEFT
+        data = GameSnapshot.capture_entities(entities, lives=2, points=40, gameover=False)
+        expected = state_of(entities)
+        rng_state = random.getstate()
+        expected_draws = [random.random() for _ in range(5)]
+
+        for _ in range(50):
+            for entity in entities[1:]:
+                entity.update(15)
+        entities[0].x = 700
+        random.seed(1)
+        self.assertEqual(GameSnapshot.restore_entities(entities, data), (2, 40, False))
+        self.assertEqual(state_of(entities), expected)
+        self.assertEqual([random.random() for _ in range(5)], expected_draws)
+        random.setstate(rng_state)
+
+    def test_rejected_snapshot_changes_nothing(self):
+        entities = make_entities()
+        data = GameSnapshot.capture_entities(entities)
+        for _ in range(20):
+            for entity in entities[1:]:
+                entity.update(15)
+        entities[0].x = 700
+        before = state_of(entities)
+        rng_state = random.getstate()
+        reordered = [entities[0], entities[2], entities[1]]  # same count, wrong record kinds
+        with self.assertRaises(ValueError):
+            GameSnapshot.restore_entities(reordered, data)
+        with self.assertRaises(ValueError):
+            GameSnapshot.restore_entities(entities, data[:-1])
+        with self.assertRaises(ValueError):
+            GameSnapshot.restore_entities(entities, data + b'\0')
+        self.assertEqual(state_of(entities), before)
+        self.assertEqual(random.getstate(), rng_state)
+
+
+if __name__ == '__main__':
+    unittest.main()